@@ -0,0 +1,2579 @@
+import calendar
+import hashlib
+import heapq
+import io
+import json
+import mmap
+import numbers
+import os
+import posixpath
+import re
+import shutil
+import struct
+import sys
+import time
+import unicodedata
+import zipfile
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from itertools import compress, islice
+
+try:
+    import numpy as np
+except ImportError:  # NumPy yoksa sütunlar array modülü ile tutulur
+    np = None
+
+# Akış halinde okurken dosyadan her seferinde okunacak karakter sayısı
+READ_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\r\n"
+
+
+# Akış Halinde JSON Okuma
+def iter_json_stream(stream, chunk_size=READ_CHUNK_SIZE):
+    """Metin akışındaki üst düzey JSON dizisinin elemanlarını tek tek üretir."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        # Tüketilen kısmı atarak tamponun tüm dosya boyunca büyümesini engelle
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    skip(_WHITESPACE + "\ufeff")
+    if pos >= len(buffer):
+        return
+    if buffer[pos] != "[":
+        raise ValueError("JSON dosyası bir kayıt dizisi ile başlamıyor")
+    pos += 1
+
+    def next_char():
+        skip(_WHITESPACE)
+        if pos >= len(buffer):
+            raise ValueError("JSON dizisi beklenmedik şekilde bitti")
+        return buffer[pos]
+
+    if next_char() == "]":
+        return
+
+    while True:
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Kayıt tamponun sonunda yarım kalmış olabilir
+                if eof or not fill():
+                    raise
+                continue
+            if end == len(buffer) and not eof and fill():
+                # Sayı gibi sonu belirsiz bir değer olabilir, tamamını görmeden kabul etme
+                continue
+            break
+
+        pos = end
+        yield record
+
+        # Elemanlar arasında tam olarak bir virgül olmalı; bozuk dosya kısmen okunmasın
+        separator = next_char()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"JSON dizisinde elemanlar arasında virgül bekleniyordu: {separator!r}")
+        pos += 1
+        next_char()
+
+
+def iter_json_records(file_path, chunk_size=READ_CHUNK_SIZE):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        yield from iter_json_stream(f, chunk_size)
+
+
+# Hesap verisi dışa aktarımında farklı şemalı JSON dosyaları da bulunur (Userdata.json, SearchQueries.json,
+# StreamingHistory_music_*.json); klasörden de ZIP'ten de yalnızca genişletilmiş dinleme geçmişi dosyaları okunur.
+HISTORY_FILE_PREFIX = "Streaming_History"
+
+
+def _history_files(paths, basename):
+    history = [path for path in paths if basename(path).startswith(HISTORY_FILE_PREFIX)]
+    skipped = [path for path in paths if not basename(path).startswith(HISTORY_FILE_PREFIX)]
+    if skipped:
+        print(f"Dinleme geçmişi olmayan {len(skipped)} dosya atlandı: {', '.join(map(basename, skipped))}")
+    return history
+
+
+def list_json_files(directory_path):
+    return _history_files([
+        os.path.join(directory_path, file_name)
+        for file_name in os.listdir(directory_path)
+        if file_name.endswith(".json")
+    ], os.path.basename)
+
+
+# ZIP Arşivinden Okuma
+def list_zip_members(zip_path):
+    with zipfile.ZipFile(zip_path) as archive:
+        members = [
+            info.filename
+            for info in archive.infolist()
+            if info.filename.endswith(".json") and not info.is_dir() and not info.filename.startswith("__MACOSX/")
+        ]
+    return _history_files(members, posixpath.basename)
+
+
+def iter_zip_member_records(zip_path, member, chunk_size=READ_CHUNK_SIZE):
+    """ZIP üyesini diske çıkarmadan, sıkıştırılmış akıştan okuyarak kayıtlarını üretir."""
+    with zipfile.ZipFile(zip_path) as archive, archive.open(member) as raw:
+        yield from iter_json_stream(io.TextIOWrapper(raw, encoding='utf-8'), chunk_size)
+
+
+def is_zip_source(path):
+    return os.path.isfile(path) and path.lower().endswith(".zip")
+
+
+# Kaynaklar: klasördeki JSON dosyaları yol olarak, ZIP üyeleri (arşiv yolu, üye adı) çifti olarak gösterilir
+def list_history_sources(path):
+    if is_zip_source(path):
+        return [(path, member) for member in list_zip_members(path)]
+    return list_json_files(path)
+
+
+def iter_source_records(source):
+    if isinstance(source, tuple):
+        return iter_zip_member_records(*source)
+    return iter_json_records(source)
+
+
+def source_name(source):
+    if isinstance(source, tuple):
+        return f"{os.path.basename(source[0])}/{source[1]}"
+    return os.path.basename(source)
+
+
+def _iter_sources_records(sources):
+    for source in sources:
+        try:
+            yield from iter_source_records(source)
+        except Exception as e:
+            print(f"Dosya okunurken hata oluştu: {source_name(source)}. Hata: {e}")
+
+
+def iter_zip_records(zip_path):
+    """Spotify ZIP arşivindeki tüm JSON üyelerinin kayıtlarını sırayla üretir."""
+    return _iter_sources_records(list_history_sources(zip_path))
+
+
+# Metin Sözlüğü
+class StringDictionary:
+    """Her farklı metne bir kez, sıkı bir tamsayı kimlik verir."""
+
+    def __init__(self, values=()):
+        self.values = []
+        self.index = {}
+        for value in values:
+            self.intern(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value):
+        return self.index.get(value)
+
+    def decode(self, code):
+        return self.values[code]
+
+
+# Paralel Dosya Okuma
+def resolve_worker_count(workers):
+    if not workers or workers < 1:
+        return os.cpu_count() or 1
+    return workers
+
+
+def map_files(func, file_paths, workers=None, on_result=None):
+    """func'ı dosyalara (veya ZIP üyelerine) ayrı süreçlerde uygular; sonuçlar dosya sırasıyla döner.
+
+    on_result verilirse her sonuç geldiğinde, tamamlanan dosya sayısıyla çağrılır.
+    """
+    workers = min(resolve_worker_count(workers), len(file_paths))
+    if workers <= 1:
+        results = map(func, file_paths)
+        return _collect(results, on_result)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return _collect(executor.map(func, file_paths), on_result)
+
+
+def _collect(results, on_result):
+    if on_result is None:
+        return list(results)
+    collected = []
+    for result in results:
+        collected.append(result)
+        on_result(len(collected))
+    return collected
+
+
+# Sütun Bazlı Dinleme Tablosu
+# (sütun adı, Spotify alanı) - metin sütunları tamsayı kodlarıyla saklanır
+CODED_FIELDS = (
+    ("track", "master_metadata_track_name"),
+    ("artist", "master_metadata_album_artist_name"),
+    ("album", "master_metadata_album_album_name"),
+    ("platform", "platform"),
+    ("uri", "spotify_track_uri"),
+    ("reason_start", "reason_start"),
+    ("reason_end", "reason_end"),
+)
+FLAG_FIELDS = ("skipped", "shuffle", "offline")
+
+_NUMPY_TYPES = {"q": "int64", "i": "int32", "b": "bool", "B": "uint8"}
+
+
+def parse_timestamp(value):
+    """Spotify zaman damgasını (UTC) epoch milisaniyesine çevirir."""
+    if not value:
+        return 0
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return calendar.timegm(dt.timetuple()) * 1000 + dt.microsecond // 1000
+
+
+def to_epoch_ms(when):
+    """datetime (saat dilimi yoksa UTC kabul edilir) veya epoch milisaniyesini epoch milisaniyesine çevirir."""
+    if isinstance(when, datetime):
+        if when.tzinfo is not None:
+            when = when.astimezone(timezone.utc).replace(tzinfo=None)
+        return calendar.timegm(when.timetuple()) * 1000 + when.microsecond // 1000
+    return int(when)
+
+
+class HistoryTable:
+    """Dinleme geçmişini satır başına birkaç düzine bayt ile sütun bazlı tutar."""
+
+    def __init__(self, columns, dictionaries, duplicates_dropped=0, indexes=None):
+        self.columns = columns
+        self.dictionaries = dictionaries
+        # Yükleme sırasında ayıklanan tekrarlı dinleme sayısı
+        self.duplicates_dropped = duplicates_dropped
+        # Satırlara değil sözlük kodlarına bağlı, yükleme sırasında bir kez kurulan diziler
+        self.indexes = {} if indexes is None else indexes
+        # Adlar üzerinde arama dizini; yüklemede kurulur, arşivden ilk aramada açılır
+        self.name_index = None
+
+    def __len__(self):
+        return len(self.columns["ts"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def decode(self, name, code):
+        return self.dictionaries[name].decode(code)
+
+    def _subset_indexes(self):
+        # Zaman küpü satırların tamamından kurulduğu için alt kümeye taşınmaz; kod dizinleri geçerli kalır
+        return {name: index for name, index in self.indexes.items() if not name.startswith(CUBE_PREFIX)}
+
+    def _subset(self, columns):
+        table = HistoryTable(columns, self.dictionaries, self.duplicates_dropped, self._subset_indexes())
+        # Ad dizini yalnızca sözlüklere bağlıdır, alt tablolar paylaşır
+        table.name_index = self.name_index
+        return table
+
+    def take(self, mask):
+        """Maskesi doğru olan satırlardan, aynı sözlükleri paylaşan yeni bir tablo oluşturur."""
+        if np is not None:
+            mask = np.asarray(mask, dtype=bool)
+            columns = {name: column[mask] for name, column in self.columns.items()}
+        else:
+            columns = {name: array(_column_typecode(column), compress(column, mask))
+                       for name, column in self.columns.items()}
+        return self._subset(columns)
+
+    def sort_by_time(self):
+        """Satırları (ts, ms_played) sırasına dizer; zaten sıralıysa tabloyu olduğu gibi döndürür.
+
+        Eşit ts'li satırların sırası dosya sırasına bağlı kalmasın diye süre de anahtara katılır;
+        böylece artımlı eklemeyle tam yeniden oluşturma aynı URI için aynı son dinlemeyi seçer.
+        """
+        ts, ms_played = self.columns["ts"], self.columns["ms_played"]
+        if np is not None:
+            ts, ms_played = np.asarray(ts), np.asarray(ms_played)
+            if bool(np.all((ts[1:] > ts[:-1]) | ((ts[1:] == ts[:-1]) & (ms_played[1:] >= ms_played[:-1])))):
+                return self
+            order = np.lexsort((ms_played, ts))
+            columns = {name: np.asarray(column)[order] for name, column in self.columns.items()}
+        else:
+            keys = list(zip(ts, ms_played))
+            if all(a <= b for a, b in zip(keys, islice(keys, 1, None))):
+                return self
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            columns = {name: array(_column_typecode(column), (column[i] for i in order))
+                       for name, column in self.columns.items()}
+        # Son satıra bağlı dizinler (ör. URI adları) sıralamadan sonra yeniden kurulmalıdır
+        return HistoryTable(columns, self.dictionaries, self.duplicates_dropped)
+
+    def slice_rows(self, start, stop):
+        """[start, stop) satırlarını kopyalamadan (NumPy görünümü veya memoryview) gösteren tablo."""
+        if np is not None:
+            columns = {name: column[start:stop] for name, column in self.columns.items()}
+        else:
+            columns = {name: memoryview(column)[start:stop] for name, column in self.columns.items()}
+        return self._subset(columns)
+
+    def time_bounds(self, start=None, end=None):
+        """Sıralı ts sütununda [start, end) aralığının satır sınırlarını ikili aramayla bulur."""
+        ts = self.columns["ts"]
+        search = (lambda value: int(np.searchsorted(ts, value, side="left"))) if np is not None else (
+            lambda value: bisect_left(ts, value))
+        lo = 0 if start is None else search(to_epoch_ms(start))
+        hi = len(ts) if end is None else max(lo, search(to_epoch_ms(end)))
+        return lo, hi
+
+    def slice_range(self, start=None, end=None):
+        """[start, end) tarih aralığındaki dinlemeler; süre tüm geçmişe değil aralığın boyuna bağlıdır.
+
+        Yükleme sırasında satırlar ts'ye göre sıralandığı için geçerlidir.
+        """
+        return self.slice_rows(*self.time_bounds(start, end))
+
+    @classmethod
+    def from_records(cls, records):
+        builder = HistoryTableBuilder()
+        builder.extend(records)
+        return builder.build()
+
+    @classmethod
+    def concat(cls, tables):
+        """Tabloları sırayla birleştirir; kodlar ilk tablonun sözlüklerine göre yeniden numaralanır."""
+        tables = list(tables)
+        if not tables:
+            return HistoryTableBuilder().build()
+
+        dictionaries = {name: StringDictionary(tables[0].dictionaries[name].values) for name, _ in CODED_FIELDS}
+        parts = {name: [] for name in tables[0].columns}
+        for table in tables:
+            for name, column in table.columns.items():
+                if name in dictionaries:
+                    global_dict = dictionaries[name]
+                    remap = [global_dict.intern(value) for value in table.dictionaries[name].values]
+                    column = _remap_codes(column, remap)
+                parts[name].append(column)
+
+        columns = {name: _concat_columns(chunks) for name, chunks in parts.items()}
+        return cls(columns, dictionaries)
+
+
+class HistoryTableBuilder:
+    """Kayıtları akış halinde alıp tablo sütunlarına ekler."""
+
+    def __init__(self):
+        self.ts = array("q")
+        self.ms_played = array("q")
+        self.codes = {name: array("i") for name, _ in CODED_FIELDS}
+        self.flags = {name: array("b") for name in FLAG_FIELDS}
+        self.dictionaries = {name: StringDictionary() for name, _ in CODED_FIELDS}
+
+    def append(self, entry):
+        self.ts.append(parse_timestamp(entry.get("ts")))
+        self.ms_played.append(entry.get("ms_played", 0) or 0)
+        for name, field in CODED_FIELDS:
+            if name == "uri":
+                # Podcast bölümlerinde şarkı URI'si boştur, bölüm URI'si kullanılır
+                value = entry.get(field) or entry.get("spotify_episode_uri")
+            else:
+                value = entry.get(field, "Unknown")
+            self.codes[name].append(self.dictionaries[name].intern(value))
+        for name in FLAG_FIELDS:
+            self.flags[name].append(1 if entry.get(name) else 0)
+
+    def extend(self, records):
+        for entry in records:
+            self.append(entry)
+
+    def build(self):
+        columns = {"ts": _to_column(self.ts), "ms_played": _to_column(self.ms_played)}
+        for name, values in self.codes.items():
+            columns[name] = _to_column(values)
+        for name, values in self.flags.items():
+            columns[name] = _to_column(values)
+        return HistoryTable(columns, self.dictionaries)
+
+
+def _to_column(values):
+    if np is None:
+        return values
+    return np.frombuffer(values, dtype=_NUMPY_TYPES[values.typecode])
+
+
+def _remap_codes(column, remap):
+    if np is not None:
+        return np.asarray(remap, dtype=np.int32)[column]
+    return array("i", [remap[code] for code in column])
+
+
+def _concat_columns(chunks):
+    if np is not None:
+        return np.concatenate(chunks)
+    result = array(_column_typecode(chunks[0]))
+    for chunk in chunks:
+        result.extend(chunk)
+    return result
+
+
+def _column_typecode(column):
+    if np is not None:
+        return {"int64": "q", "int32": "i", "bool": "b", "uint8": "B"}[column.dtype.name]
+    if isinstance(column, memoryview):
+        return column.format
+    return column.typecode
+
+
+def _column_from_bytes(data, typecode):
+    if np is not None:
+        return np.frombuffer(data, dtype=_NUMPY_TYPES[typecode])
+    column = array(typecode)
+    column.frombytes(data)
+    return column
+
+
+def _table_file(source):
+    builder = HistoryTableBuilder()
+    try:
+        builder.extend(iter_source_records(source))
+    except Exception as e:
+        return builder.build(), str(e)
+    return builder.build(), None
+
+
+def load_history_table(directory_path, workers=None, cache_dir=None, progress=None, file_paths=None):
+    """Klasördeki (veya ZIP arşivindeki) JSON dosyalarını sütun bazlı tabloya dönüştürür.
+
+    Önbellekte geçerli kaydı olan dosyalar yeniden ayrıştırılmaz, kalanlar paralel olarak okunur.
+    progress(oran, metin) verilirse her dosyadan ve her aşamadan sonra çağrılır.
+    Kaynaklar zaten listelendiyse file_paths ile verilir; ZIP dizini ikinci kez okunmaz.
+    """
+    report = progress or (lambda fraction, text: None)
+    if file_paths is None:
+        file_paths = list_history_sources(directory_path)
+    tables = _load_source_tables(file_paths, workers, cache_dir, report)
+
+    report(0.9, "Tekrarlı dinlemeler ayıklanıyor")
+    table = _combine_tables(tables)
+    report(0.95, "Dizinler oluşturuluyor")
+    table.indexes.update(build_uri_index(table))
+    build_name_index(table)
+    return table
+
+
+def _load_source_tables(file_paths, workers, cache_dir, report):
+    # Dosya okuma işin büyük kısmıdır; kalan aşamalara çubuğun son %10'u ayrılır
+    cache = ParsedFileCache(cache_dir) if cache_dir else None
+    tables = [cache.load(file_path) if cache else None for file_path in file_paths]
+    missing = [i for i, table in enumerate(tables) if table is None]
+    cached = len(file_paths) - len(missing)
+    total = max(len(file_paths), 1)
+    results = map_files(_table_file, [file_paths[i] for i in missing], workers,
+                        lambda done: report(0.9 * (cached + done) / total,
+                                            f"{cached + done}/{len(file_paths)} dosya okundu"))
+
+    for i, (table, error) in zip(missing, results):
+        if error:
+            print(f"Dosya okunurken hata oluştu: {source_name(file_paths[i])}. Hata: {error}")
+        elif cache:
+            cache.store(file_paths[i], table)
+        tables[i] = table
+
+    if cache:
+        cache.save_index()
+    return tables
+
+
+def _combine_tables(tables):
+    table, invalid = drop_invalid_rows(HistoryTable.concat(tables))
+    if invalid:
+        print(f"Zaman damgası ve URI'si olmayan {invalid} kayıt atlandı.")
+    table, dropped = deduplicate_table(table)
+    if dropped:
+        print(f"Birden fazla dışa aktarımda bulunan {dropped} tekrarlı dinleme çıkarıldı.")
+    table.duplicates_dropped = dropped
+    # Tarih aralığı sorguları ikili arama ile yapılabilsin diye satırlar kronolojik sıralanır
+    return table.sort_by_time()
+
+
+# Tekrarlanan Dinlemeleri Ayıklama
+# Aynı dinleme (ts, URI, ms_played) üçlüsüyle tanınır; üçlü 64 bitlik bir özete indirgenir.
+_HASH_MASK = (1 << 64) - 1
+_HASH_FACTORS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9)
+BLOOM_BITS_PER_ROW = 10
+BLOOM_PROBES = 4
+
+
+def _play_hash(ts, uri, ms_played):
+    h = (ts * _HASH_FACTORS[0]) ^ (uri * _HASH_FACTORS[1]) ^ (ms_played * _HASH_FACTORS[2])
+    h &= _HASH_MASK
+    return (h ^ (h >> 31)) & _HASH_MASK
+
+
+def _play_hashes(ts, uri, ms_played):
+    factors = [np.uint64(factor) for factor in _HASH_FACTORS]
+    h = (ts.astype(np.uint64) * factors[0]) ^ (uri.astype(np.uint64) * factors[1]) \
+        ^ (ms_played.astype(np.uint64) * factors[2])
+    return h ^ (h >> np.uint64(31))
+
+
+def drop_invalid_rows(table):
+    """Zaman damgası ve URI'si olmayan kayıtları çıkarır. (tablo, çıkarılan sayı) döndürür.
+
+    Böyle kayıtların hepsi aynı üçlüye düşer; bırakılırsa 1970 tarihli tek bir dinleme olarak
+    kalır, geri kalanı da tekrarlı dinleme sayılırdı.
+    """
+    null_uri = table.dictionaries["uri"].lookup(None)
+    if null_uri is None:
+        return table, 0
+    if np is not None:
+        invalid = (np.asarray(table["ts"]) == 0) & (np.asarray(table["uri"]) == null_uri)
+    else:
+        invalid = [ts == 0 and uri == null_uri for ts, uri in zip(table["ts"], table["uri"])]
+    dropped = int(sum(invalid))
+    if not dropped:
+        return table, 0
+    return table.take(~invalid if np is not None else [not flag for flag in invalid]), dropped
+
+
+def deduplicate_table(table):
+    """Aynı dinlemenin tekrarlarını çıkarır, ilk görüleni tutar. (tablo, çıkarılan sayı) döndürür."""
+    if len(table) < 2:
+        return table, 0
+    if np is not None:
+        duplicate = _duplicate_mask_sorted(table["ts"], table["uri"], table["ms_played"])
+    else:
+        duplicate = _duplicate_mask_bloom(table["ts"], table["uri"], table["ms_played"])
+    dropped = int(sum(duplicate))
+    if not dropped:
+        return table, 0
+    if np is not None:
+        keep = ~duplicate
+    else:
+        keep = [not flag for flag in duplicate]
+    return table.take(keep), dropped
+
+
+def _duplicate_mask_sorted(ts, uri, ms_played):
+    # Satır başına yalnızca 8 baytlık özet sıralanır; eşit özetler asıl üçlüyle doğrulanır
+    ts, uri, ms_played = np.asarray(ts), np.asarray(uri), np.asarray(ms_played)
+    hashes = _play_hashes(ts, uri, ms_played)
+    order = np.argsort(hashes, kind="stable")
+    sorted_hashes = hashes[order]
+    same = np.empty(len(order), dtype=bool)
+    same[0] = False
+    same[1:] = sorted_hashes[1:] == sorted_hashes[:-1]
+
+    # Her satır, aynı özete sahip ilk (en erken) satırla karşılaştırılır
+    run_id = np.cumsum(~same) - 1
+    firsts = order[np.flatnonzero(~same)][run_id]
+    exact = (ts[order] == ts[firsts]) & (uri[order] == uri[firsts]) & (ms_played[order] == ms_played[firsts])
+
+    # Özeti çakışan farklı dinlemelerin bulunduğu gruplar (çok nadir) asıl üçlüye göre ayrıca sıralanır
+    mixed = np.zeros(len(firsts) and int(run_id[-1]) + 1, dtype=bool)
+    mixed[run_id[~exact]] = True
+    in_mixed = mixed[run_id]
+
+    duplicate = np.zeros(len(order), dtype=bool)
+    duplicate[order[same & ~in_mixed]] = True
+    if in_mixed.any():
+        rows = np.sort(order[in_mixed])
+        # lexsort kararlıdır; eşit üçlülerin ilki en erken satırdır
+        rows = rows[np.lexsort((ms_played[rows], uri[rows], ts[rows]))]
+        repeat = (ts[rows[1:]] == ts[rows[:-1]]) & (uri[rows[1:]] == uri[rows[:-1]]) \
+            & (ms_played[rows[1:]] == ms_played[rows[:-1]])
+        duplicate[rows[1:][repeat]] = True
+    return duplicate
+
+
+def _duplicate_mask_bloom(ts, uri, ms_played):
+    # Bloom filtresi "kesinlikle yeni" satırları eler; yalnızca aday satırların üçlüleri bellekte tutulur
+    size = max(len(ts) * BLOOM_BITS_PER_ROW, 64)
+    bits = bytearray(size // 8 + 1)
+    candidates = []
+    for i, key in enumerate(zip(ts, uri, ms_played)):
+        h = _play_hash(*key)
+        seen = True
+        for probe in range(BLOOM_PROBES):
+            position = ((h >> (probe * 16)) * 0x9E3779B1 + probe) % size
+            byte, bit = divmod(position, 8)
+            if not bits[byte] & (1 << bit):
+                bits[byte] |= 1 << bit
+                seen = False
+        if seen:
+            candidates.append(i)
+
+    # Adayları baştan taramayla doğrula: Bloom filtresinin yanlış pozitifleri burada ayıklanır
+    candidate_keys = {(ts[i], uri[i], ms_played[i]) for i in candidates}
+    duplicate = [False] * len(ts)
+    seen_keys = set()
+    for i, key in enumerate(zip(ts, uri, ms_played)):
+        if key in candidate_keys:
+            if key in seen_keys:
+                duplicate[i] = True
+            else:
+                seen_keys.add(key)
+    return duplicate
+
+
+# Ayrıştırılmış Veri Önbelleği
+CACHE_FORMAT_VERSION = 2
+_TABLE_MAGIC = b"SPHT"
+
+
+def write_table(table, stream):
+    """Tabloyu başlık + ham sütun baytları biçiminde yazar."""
+    columns = [(name, _column_typecode(column)) for name, column in table.columns.items()]
+    header = {
+        "version": CACHE_FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "rows": len(table),
+        "columns": columns,
+        "dictionaries": {name: dictionary.values for name, dictionary in table.dictionaries.items()},
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    stream.write(_TABLE_MAGIC)
+    stream.write(struct.pack("<I", len(header_bytes)))
+    stream.write(header_bytes)
+    for name, _ in columns:
+        stream.write(table.columns[name].tobytes())
+
+
+def read_table(stream):
+    if stream.read(len(_TABLE_MAGIC)) != _TABLE_MAGIC:
+        raise ValueError("Geçersiz önbellek dosyası")
+    (header_size,) = struct.unpack("<I", stream.read(4))
+    header = json.loads(stream.read(header_size).decode("utf-8"))
+    if header["version"] != CACHE_FORMAT_VERSION or header["byteorder"] != sys.byteorder:
+        raise ValueError("Önbellek dosyası bu sürümle uyumsuz")
+
+    rows = header["rows"]
+    columns = {}
+    for name, typecode in header["columns"]:
+        size = rows * array(typecode).itemsize
+        data = stream.read(size)
+        if len(data) != size:
+            raise ValueError("Önbellek dosyası eksik")
+        columns[name] = _column_from_bytes(data, typecode)
+    dictionaries = {name: StringDictionary(values) for name, values in header["dictionaries"].items()}
+    return HistoryTable(columns, dictionaries)
+
+
+def file_content_hash(file_path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(file_path):
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": file_content_hash(file_path)}
+
+
+def file_unchanged(file_path, entry):
+    """Dosya kayıttaki parmak iziyle aynı içeriğe sahip mi?
+
+    Yalnızca değişiklik zamanı farklıysa içerik özeti karşılaştırılır ve eşleşirse kayıttaki zaman güncellenir.
+    """
+    stat = os.stat(file_path)
+    if stat.st_size != entry["size"]:
+        return False
+    if stat.st_mtime_ns != entry["mtime_ns"]:
+        if file_content_hash(file_path) != entry["hash"]:
+            return False
+        entry["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def source_key(source):
+    if isinstance(source, tuple):
+        return f"{os.path.abspath(source[0])}!{source[1]}"
+    return os.path.abspath(source)
+
+
+def source_fingerprint(source):
+    """ZIP üyeleri için arşivdeki boyut ve CRC değeri içerik özeti yerine geçer."""
+    if isinstance(source, tuple):
+        with zipfile.ZipFile(source[0]) as archive:
+            info = archive.getinfo(source[1])
+        return {"size": info.file_size, "crc": info.CRC}
+    return file_fingerprint(source)
+
+
+def source_unchanged(source, entry):
+    if isinstance(source, tuple):
+        try:
+            fingerprint = source_fingerprint(source)
+        except KeyError:
+            return False
+        return fingerprint["size"] == entry.get("size") and fingerprint["crc"] == entry.get("crc")
+    return file_unchanged(source, entry)
+
+
+def _replace_atomically(path, write):
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        write(f)
+    os.replace(temp_path, path)
+
+
+class ParsedFileCache:
+    """Ayrıştırılmış dosyaları yol, boyut, değişiklik zamanı ve içerik özetine göre diskte saklar."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.files = self._read_index()
+        self.dirty = False
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if index.get("version") != CACHE_FORMAT_VERSION:
+            return {}
+        return index.get("files", {})
+
+    def _entry_path(self, entry):
+        return os.path.join(self.cache_dir, entry["entry"])
+
+    def load(self, file_path):
+        """Dosya değişmemişse önbellekteki tabloyu, aksi halde None döndürür."""
+        entry = self.files.get(source_key(file_path))
+        if entry is None:
+            return None
+
+        mtime_ns = entry.get("mtime_ns")
+        if not source_unchanged(file_path, entry):
+            return None
+        self.dirty = self.dirty or entry.get("mtime_ns") != mtime_ns
+
+        try:
+            with open(self._entry_path(entry), 'rb') as f:
+                return read_table(f)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, file_path, table):
+        key = source_key(file_path)
+        entry = source_fingerprint(file_path)
+        entry["entry"] = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest() + ".bin"
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _replace_atomically(self._entry_path(entry), lambda f: write_table(table, f))
+        self.files[key] = entry
+        self.dirty = True
+
+    def save_index(self):
+        if not self.dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        index = {"version": CACHE_FORMAT_VERSION, "files": self.files}
+        _replace_atomically(self.index_path, lambda f: f.write(json.dumps(index, indent=4).encode("utf-8")))
+        self.dirty = False
+
+
+# Bellek Eşlemeli Geçmiş Arşivi
+# Arşiv klasöründe meta.json ve her yazımda yeni bir nesil klasörü bulunur; açık eşlemeler
+# eski nesli kullanmaya devam ederken yeni nesil güvenle yazılabilir.
+STORE_FORMAT_VERSION = 8
+
+
+class MappedStringDictionary:
+    """Diskteki UTF-8 metin bloğu üzerinden çalışan, yalnızca okunabilir metin sözlüğü."""
+
+    def __init__(self, blob, offsets, nulls):
+        self.blob = blob
+        self.offsets = offsets
+        self.nulls = frozenset(nulls)
+        self._values = None
+        self._index = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def decode(self, code):
+        if code in self.nulls:
+            return None
+        return bytes(self.blob[self.offsets[code]:self.offsets[code + 1]]).decode("utf-8")
+
+    @property
+    def values(self):
+        if self._values is None:
+            self._values = [self.decode(code) for code in range(len(self))]
+        return self._values
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {value: code for code, value in enumerate(self.values)}
+        return self._index
+
+    def lookup(self, value):
+        if value is None:
+            # Boş değerin kodu meta.json'dan bilinir; analizlerdeki bu sorgu tüm metinleri çözdürmesin
+            return min(self.nulls) if self.nulls else None
+        return self.index.get(value)
+
+
+def history_store_path(directory_path, cache_dir):
+    key = hashlib.blake2b(os.path.abspath(directory_path).encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(cache_dir, f"arsiv_{key}")
+
+
+def _write_bytes(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _write_store_meta(store_path, meta):
+    _replace_atomically(os.path.join(store_path, "meta.json"),
+                        lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8")))
+
+
+def write_history_store(table, store_path, sources):
+    """Tabloyu sabit genişlikli sütun dosyaları ve metin sözlüğü dosyaları olarak yazar."""
+    _write_store_generation(store_path, len(table), table.columns.items(), table.dictionaries, table.indexes,
+                            table.duplicates_dropped, sources)
+
+
+def _write_store_generation(store_path, rows, columns, dictionaries, indexes, duplicates_dropped, sources):
+    # columns (ad, sütun) çiftleri üretebilir; sütunlar tek tek yazıldığından hepsi aynı anda bellekte olmaz
+    generation = f"g{time.time_ns()}"
+    data_path = os.path.join(store_path, generation)
+    os.makedirs(data_path)
+
+    column_types = []
+    for name, column in columns:
+        _write_bytes(os.path.join(data_path, name + ".col"), column.tobytes())
+        column_types.append([name, _column_typecode(column)])
+
+    nulls_by_name = {}
+    for name, dictionary in dictionaries.items():
+        offsets = array("q", [0])
+        nulls = []
+        with open(os.path.join(data_path, name + ".dict"), 'wb') as f:
+            for code, value in enumerate(dictionary.values):
+                if value is None:
+                    nulls.append(code)
+                else:
+                    f.write(value.encode("utf-8"))
+                offsets.append(f.tell())
+        _write_bytes(os.path.join(data_path, name + ".offsets"), offsets.tobytes())
+        nulls_by_name[name] = nulls
+
+    index_types = []
+    for name, index in indexes.items():
+        _write_bytes(os.path.join(data_path, name + ".idx"), index.tobytes())
+        index_types.append([name, _column_typecode(index)])
+
+    meta = {
+        "version": STORE_FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "generation": generation,
+        "rows": rows,
+        "columns": column_types,
+        "dictionaries": nulls_by_name,
+        "indexes": index_types,
+        "duplicates_dropped": duplicates_dropped,
+        "sources": sources,
+    }
+    # meta.json en son yazılır; yarım kalan bir yazım eski arşivi bozmaz
+    _write_store_meta(store_path, meta)
+
+    for entry in os.listdir(store_path):
+        if entry != generation and entry.startswith("g"):
+            shutil.rmtree(os.path.join(store_path, entry), ignore_errors=True)
+
+
+def _map_column(path, typecode):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _column_from_bytes(b"", typecode)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if np is not None:
+        return np.frombuffer(mapped, dtype=_NUMPY_TYPES[typecode])
+    return memoryview(mapped).cast(typecode)
+
+
+def _read_store_meta(store_path):
+    try:
+        with open(os.path.join(store_path, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != STORE_FORMAT_VERSION or meta.get("byteorder") != sys.byteorder:
+        return None
+    return meta
+
+
+def _added_sources(store_path, meta, file_paths):
+    """Arşivde henüz bulunmayan kaynaklar; arşivdeki bir kaynak değişmiş veya kaldırılmışsa None."""
+    sources = meta["sources"]
+    by_key = {source_key(file_path): file_path for file_path in file_paths}
+    if not set(sources) <= set(by_key):
+        return None
+    mtimes = {key: entry.get("mtime_ns") for key, entry in sources.items()}
+    if not all(source_unchanged(by_key[key], entry) for key, entry in sources.items()):
+        return None
+    # İçeriği aynı kalıp değişiklik zamanı güncellenen dosyalar bir sonraki açılışta yeniden özetlenmesin
+    if any(entry.get("mtime_ns") != mtimes[key] for key, entry in sources.items()):
+        _write_store_meta(store_path, meta)
+    return [file_path for key, file_path in by_key.items() if key not in sources]
+
+
+def _map_store(store_path, meta):
+    data_path = os.path.join(store_path, meta["generation"])
+    try:
+        columns = {name: _map_column(os.path.join(data_path, name + ".col"), typecode)
+                   for name, typecode in meta["columns"]}
+        dictionaries = {
+            name: MappedStringDictionary(
+                _map_column(os.path.join(data_path, name + ".dict"), "B"),
+                _map_column(os.path.join(data_path, name + ".offsets"), "q"),
+                nulls,
+            )
+            for name, nulls in meta["dictionaries"].items()
+        }
+        indexes = {name: _map_column(os.path.join(data_path, name + ".idx"), typecode)
+                   for name, typecode in meta["indexes"]}
+    except OSError:
+        return None
+    return HistoryTable(columns, dictionaries, meta.get("duplicates_dropped", 0), indexes)
+
+
+def open_history_store(store_path, file_paths):
+    """Kaynak dosyalar değişmediyse arşivi hiçbir şey çözmeden mmap ile açar, aksi halde None döndürür."""
+    meta = _read_store_meta(store_path)
+    if meta is None or _added_sources(store_path, meta, file_paths) != []:
+        return None
+    return _map_store(store_path, meta)
+
+
+def _merge_plan(table, new):
+    """new satırlarının tabloda aynısı (ts, URI, ms_played) bulunanların maskesi ve eklenecekleri konumlar.
+
+    İki tablo da (ts, ms_played) sırasındadır. Yalnızca yeni satırlarla aynı ts'ye sahip eski satırlar
+    yeni satırlarla birlikte bir kez sıralanır; eşit ts'li uzun bir dizi de doğrusal maliyetlidir.
+    """
+    if np is None:
+        return _merge_plan_python(table, new)
+    ts = np.asarray(table["ts"])
+    new_ts, new_uri, new_ms = np.asarray(new["ts"]), np.asarray(new["uri"]), np.asarray(new["ms_played"])
+    lo = np.searchsorted(ts, new_ts, side="left")
+    hi = np.searchsorted(ts, new_ts, side="right")
+    # Farklı ts'lerin aralıkları ayrıktır; her aralığın eski satırları bir kez alınır
+    starts, first = np.unique(lo, return_index=True)
+    sizes = hi[first] - starts
+    offsets = np.cumsum(sizes) - sizes
+    rows = np.repeat(starts - offsets, sizes) + np.arange(int(sizes.sum()))
+    before = offsets[np.searchsorted(starts, lo)]
+
+    size = len(rows)
+    keys_ts = np.concatenate([ts[rows], new_ts])
+    keys_ms = np.concatenate([np.asarray(table["ms_played"])[rows], new_ms])
+    keys_uri = np.concatenate([np.asarray(table["uri"])[rows], new_uri])
+    is_new = np.arange(size + len(new_ts)) >= size
+    # Eşit üçlülerde eski satır önce gelir
+    order = np.lexsort((is_new, keys_uri, keys_ms, keys_ts))
+    sorted_new = is_new[order]
+    changed = np.ones(len(order), dtype=bool)
+    changed[1:] = (keys_ts[order][1:] != keys_ts[order][:-1]) | (keys_ms[order][1:] != keys_ms[order][:-1]) \
+        | (keys_uri[order][1:] != keys_uri[order][:-1])
+    group = np.cumsum(changed) - 1
+    has_old = np.zeros(len(order) and int(group[-1]) + 1, dtype=bool)
+    has_old[group[~sorted_new]] = True
+
+    new_rows = order[sorted_new] - size
+    found = np.empty(len(new_ts), dtype=bool)
+    found[new_rows] = has_old[group[sorted_new]]
+    # Konum: aynı ts aralığında bu satırdan önce sıralanan eski satır sayısı kadar aralığın ilerisi
+    old_before = np.cumsum(~sorted_new)[sorted_new]
+    positions = np.empty(len(new_ts), dtype=np.int64)
+    positions[new_rows] = lo[new_rows] + old_before - before[new_rows]
+    return found, positions
+
+
+def _merge_plan_python(table, new):
+    ts, uri, ms_played = table["ts"], table["uri"], table["ms_played"]
+    spans = {}
+    found = []
+    positions = []
+    for new_ts, new_uri, new_ms in zip(new["ts"], new["uri"], new["ms_played"]):
+        span = spans.get(new_ts)
+        if span is None:
+            lo, hi = bisect_left(ts, new_ts), bisect_right(ts, new_ts)
+            span = spans[new_ts] = (lo, {(uri[i], ms_played[i]) for i in range(lo, hi)}, ms_played[lo:hi])
+        lo, plays, span_ms = span
+        found.append((new_uri, new_ms) in plays)
+        positions.append(lo + bisect_right(span_ms, new_ms))
+    return found, positions
+
+
+def _insert_rows(column, positions, values):
+    # Aynı konuma eklenen satırlar verilen sırayı korur; NumPy dışında positions artan sırada olmalıdır
+    if np is not None:
+        return np.insert(np.asarray(column), positions, values)
+    result = array(_column_typecode(column))
+    previous = 0
+    for position, value in zip(positions, values):
+        result.extend(column[previous:position])
+        result.append(value)
+        previous = position
+    result.extend(column[previous:])
+    return result
+
+
+def _extend_uri_index(indexes, size, new):
+    """URI dizinini yalnızca yeni satırlarla günceller; son dinleme (ts, ms_played) sırasına göre seçilir."""
+    extended = {}
+    for name, fill in _uri_index_fills():
+        index = indexes[name]
+        if np is not None:
+            grown = np.full(size, fill, dtype=np.asarray(index).dtype)
+            grown[:len(index)] = index
+        else:
+            grown = array(_column_typecode(index), index)
+            grown.extend(array(grown.typecode, [fill]) * (size - len(index)))
+        extended[name] = grown
+
+    if np is not None:
+        uri = np.asarray(new["uri"])
+        last_row = np.full(size, -1, dtype=np.int64)
+        np.maximum.at(last_row, uri, np.arange(len(uri), dtype=np.int64))
+        codes = np.flatnonzero(last_row >= 0)
+        rows = last_row[codes]
+        new_ts, new_ms = np.asarray(new["ts"])[rows], np.asarray(new["ms_played"])[rows]
+        old_ts, old_ms = extended["uri_ts"][codes], extended["uri_ms_played"][codes]
+        newer = (new_ts > old_ts) | ((new_ts == old_ts) & (new_ms > old_ms))
+        codes, rows = codes[newer], rows[newer]
+        for field in URI_INDEX_FIELDS + URI_STAMP_FIELDS:
+            extended["uri_" + field][codes] = np.asarray(new[field])[rows]
+        return extended
+
+    for row, (uri, ts, ms_played) in enumerate(zip(new["uri"], new["ts"], new["ms_played"])):
+        if (ts, ms_played) > (extended["uri_ts"][uri], extended["uri_ms_played"][uri]):
+            for field in URI_INDEX_FIELDS + URI_STAMP_FIELDS:
+                extended["uri_" + field][uri] = new[field][row]
+    return extended
+
+
+def extend_history_store(table, store_path, meta, file_paths, workers=None, cache_dir=None, progress=None):
+    """Arşive yalnızca yeni kaynakların dinlemelerini katar ve yeni bir nesil yazar.
+
+    Yeni satırlar kendi aralarında ve arşivdekilerle tekrar için karşılaştırılır, (ts, ms_played)
+    sırasındaki sütunlarda tam yeniden oluşturmadaki yerlerine eklenir. URI ve ad dizinleri yalnızca yeni satırlar ve
+    yeni adlarla güncellenir; ayrıştırma ve dizin kurma işi arşivin değil yeni verinin boyuyla ölçeklenir.
+    """
+    report = progress or (lambda fraction, text: None)
+    new = _combine_tables(_load_source_tables(file_paths, workers, cache_dir, report))
+
+    report(0.9, "Yeni dinlemeler arşive ekleniyor")
+    new_duplicates = new.duplicates_dropped
+    dictionaries = {}
+    new_columns = dict(new.columns)
+    for name, _ in CODED_FIELDS:
+        # Sözlükler yalnızca sona eklenerek büyür; arşivdeki kodlar geçerli kalır
+        dictionary = dictionaries[name] = StringDictionary(table.dictionaries[name].values)
+        remap = [dictionary.intern(value) for value in new.dictionaries[name].values]
+        new_columns[name] = _remap_codes(new.columns[name], remap)
+    new = HistoryTable(new_columns, dictionaries)
+    existing, positions = _merge_plan(table, new)
+    dropped = int(sum(existing))
+    duplicates_dropped = table.duplicates_dropped + new_duplicates + dropped
+    if dropped:
+        print(f"Arşivde zaten bulunan {dropped} dinleme çıkarıldı.")
+        keep = [not flag for flag in existing] if np is None else ~existing
+        new = new.take(keep)
+        positions = list(compress(positions, keep)) if np is None else positions[keep]
+
+    report(0.95, "Dizinler güncelleniyor")
+    indexes = _extend_uri_index(table.indexes, len(dictionaries["uri"]), new)
+    names = NameIndex.from_indexes(table.indexes)
+    names.extend(dictionaries)
+    indexes.update(names.to_indexes())
+
+    sources = dict(meta["sources"])
+    sources.update((source_key(file_path), source_fingerprint(file_path)) for file_path in file_paths)
+    # Sütunlar tek tek birleştirilip yazılır
+    columns = ((name, _insert_rows(column, positions, new[name])) for name, column in table.columns.items())
+    _write_store_generation(store_path, len(table) + len(new), columns, dictionaries, indexes,
+                            duplicates_dropped, sources)
+
+
+def open_history(directory_path, cache_dir, workers=None, progress=None):
+    """Klasörün (veya ZIP arşivinin) geçmişini arşivden açar.
+
+    Arşivden sonra eklenen dosyalar (ör. yeni bir dışa aktarım) arşive katılır; arşivdeki bir dosya
+    değişmiş veya kaldırılmışsa ya da arşiv yoksa arşiv baştan oluşturulur.
+    """
+    report = progress or (lambda fraction, text: None)
+    store_path = history_store_path(directory_path, cache_dir)
+    file_paths = list_history_sources(directory_path)
+    meta = _read_store_meta(store_path)
+    added = None if meta is None else _added_sources(store_path, meta, file_paths)
+    table = None if added is None else _map_store(store_path, meta)
+    if table is not None and added:
+        extend_history_store(table, store_path, meta, added, workers, cache_dir, progress)
+        table = open_history_store(store_path, file_paths)
+    if table is None:
+        table = load_history_table(directory_path, workers, cache_dir, progress, file_paths)
+        report(0.97, "Arşiv yazılıyor")
+        sources = {source_key(file_path): source_fingerprint(file_path) for file_path in file_paths}
+        write_history_store(table, store_path, sources)
+        # Yeniden eşlenmiş hali, sayfa önbelleğini diğer süreçlerle paylaşır
+        table = open_history_store(store_path, file_paths) or table
+    report(1.0, f"{len(table)} dinleme yüklendi")
+    return table
+
+
+# İlk K Seçimi
+def top_k_order(values, k=None, tiebreak=None):
+    """En büyük k değerin indekslerini azalan sırada döndürür; eşitlikte tiebreak'i küçük olan önce gelir.
+
+    Tüm diziyi sıralamak yerine NumPy'de argpartition benzeri bir eşik, aksi halde bir yığın kullanılır.
+    k None ise tam sıralama yapılır.
+    """
+    size = len(values)
+    if tiebreak is None:
+        tiebreak = range(size) if np is None else np.arange(size)
+    if np is not None:
+        values = np.asarray(values)
+        tiebreak = np.asarray(tiebreak)
+        if k is None or k >= size:
+            return np.lexsort((tiebreak, -values))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        # Eşiği geçen (ve eşite eşit olan) adaylar az sayıdadır; yalnızca onlar sıralanır
+        threshold = np.partition(values, size - k)[size - k]
+        candidates = np.flatnonzero(values >= threshold)
+        return candidates[np.lexsort((tiebreak[candidates], -values[candidates]))[:k]]
+
+    key = lambda i: (-values[i], tiebreak[i])
+    if k is None or k >= size:
+        return sorted(range(size), key=key)
+    return heapq.nsmallest(max(k, 0), range(size), key=key)
+
+
+class StreamingTopK:
+    """Kayıtlar akarken, toplamı yalnızca artan anahtarlar arasında ilk K'yı güncel tutar.
+
+    Bir anahtar ilk K'ya ancak o anki en küçük üyeyi geçerek girebildiği için her eklemede
+    yalnızca bu eşikle karşılaştırma yapılır; en küçük üye gerektiğinde yeniden bulunur.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.totals = {}
+        self.top = {}
+        self._min_key = None
+
+    def add(self, key, amount):
+        total = self.totals.get(key, 0) + amount
+        self.totals[key] = total
+        top = self.top
+        if key in top:
+            top[key] = total
+            if key == self._min_key:
+                self._min_key = None
+        elif len(top) < self.k:
+            top[key] = total
+            self._min_key = None
+        else:
+            min_key = self._current_min()
+            if total > top[min_key]:
+                del top[min_key]
+                top[key] = total
+                self._min_key = None
+
+    def _current_min(self):
+        if self._min_key is None:
+            self._min_key = min(self.top, key=self.top.get)
+        return self._min_key
+
+    def items(self):
+        return sorted(self.top.items(), key=lambda item: item[1], reverse=True)
+
+
+# Vektörel Toplama
+class GroupTotals:
+    """Kodlu bir sütuna göre toplamlar.
+
+    Süreler tam sayı milisaniye olarak tutulur; minutes_played, analyze_data'daki gibi her
+    dinlemenin tam dakikalarının toplamıdır. Gruplar dakika azalan, eşitlikte ilk görülme
+    sırasına göre dizilidir.
+    """
+
+    def __init__(self, name, codes, ms_played, minutes_played, plays, first_row, last_row):
+        self.name = name
+        self.codes = codes
+        self.ms_played = ms_played
+        self.minutes_played = minutes_played
+        self.plays = plays
+        self.first_row = first_row
+        self.last_row = last_row
+
+    def __len__(self):
+        return len(self.codes)
+
+
+def group_totals(table, name, k=None):
+    return group_codes(name, table[name], table["ms_played"], len(table.dictionaries[name]), k)
+
+
+def group_codes(name, codes, ms_played, size, k=None):
+    """0..size-1 aralığındaki grup kodlarına göre süreleri toplar; k verilirse yalnızca ilk k grup döner."""
+    if np is not None:
+        return _group_codes_numpy(name, codes, ms_played, size, k)
+    return _group_codes_python(name, codes, ms_played, size, k)
+
+
+def _group_codes_numpy(name, codes, ms_played, size, k):
+    codes = np.asarray(codes)
+    ms_played = np.asarray(ms_played)
+    rows = np.arange(len(codes), dtype=np.int64)
+
+    plays = np.bincount(codes, minlength=size)
+    # Ağırlıklı bincount float64 döndürür; 2**53 ms'ye kadar toplamlar tam sayı olarak kesindir
+    ms_totals = np.bincount(codes, weights=ms_played, minlength=size).astype(np.int64)
+    minute_totals = np.bincount(codes, weights=ms_played // 60000, minlength=size).astype(np.int64)
+    first_row = np.full(size, len(codes), dtype=np.int64)
+    np.minimum.at(first_row, codes, rows)
+    last_row = np.full(size, -1, dtype=np.int64)
+    np.maximum.at(last_row, codes, rows)
+
+    present = np.flatnonzero(plays)
+    order = present[top_k_order(minute_totals[present], k, first_row[present])]
+    return GroupTotals(name, order, ms_totals[order], minute_totals[order], plays[order],
+                       first_row[order], last_row[order])
+
+
+def _group_codes_python(name, codes, ms_played, size, k):
+    plays = [0] * size
+    ms_totals = [0] * size
+    minute_totals = [0] * size
+    first_row = [-1] * size
+    last_row = [-1] * size
+    for row, (code, ms) in enumerate(zip(codes, ms_played)):
+        if first_row[code] < 0:
+            first_row[code] = row
+        last_row[code] = row
+        plays[code] += 1
+        ms_totals[code] += ms
+        minute_totals[code] += ms // 60000
+
+    present = [code for code in range(size) if plays[code]]
+    order = [present[i] for i in top_k_order([minute_totals[c] for c in present], k,
+                                             [first_row[c] for c in present])]
+    return GroupTotals(name, order, [ms_totals[c] for c in order], [minute_totals[c] for c in order],
+                       [plays[c] for c in order], [first_row[c] for c in order], [last_row[c] for c in order])
+
+
+def gather(column, rows):
+    """Sütunun verilen satırlardaki değerlerini Python listesi olarak döndürür."""
+    if np is not None:
+        return np.asarray(column)[np.asarray(rows, dtype=np.int64)].tolist()
+    return [column[row] for row in rows]
+
+
+def as_list(values):
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+def analyze_table(table, k=None):
+    """analyze_data ile aynı sonucu sütun bazlı tablo üzerinde grup toplamlarıyla üretir."""
+    totals = group_totals(table, "track", k)
+    tracks = table.dictionaries["track"]
+    artists = table.dictionaries["artist"]
+    albums = table.dictionaries["album"]
+    return [
+        {
+            "track_name": tracks.decode(code),
+            "minutes_played": minutes_played,
+            "artist_name": artists.decode(artist),
+            "album_name": albums.decode(album),
+        }
+        for code, minutes_played, artist, album in zip(
+            as_list(totals.codes),
+            as_list(totals.minutes_played),
+            gather(table["artist"], totals.last_row),
+            gather(table["album"], totals.last_row),
+        )
+    ]
+
+
+def analyze_group(table, name, k=None):
+    """Sanatçı, albüm veya platform gibi tek bir sütuna göre dakika toplamlarını döndürür."""
+    totals = group_totals(table, name, k)
+    dictionary = table.dictionaries[name]
+    return [
+        {f"{name}_name": dictionary.decode(code), "minutes_played": minutes_played}
+        for code, minutes_played in zip(as_list(totals.codes), as_list(totals.minutes_played))
+    ]
+
+
+# URI Bazlı Toplama
+URI_INDEX_FIELDS = ("track", "artist", "album")
+# URI'nin son dinlemesinin zamanı ve süresi; arşive yeni dinlemeler eklenirken hangisinin son olduğunu belirler
+URI_STAMP_FIELDS = ("ts", "ms_played")
+_MISSING_TS = -(1 << 63)
+
+
+def _uri_index_fills():
+    return [("uri_" + field, -1) for field in URI_INDEX_FIELDS] + \
+        [("uri_" + field, _MISSING_TS) for field in URI_STAMP_FIELDS]
+
+
+def build_uri_index(table):
+    """Her URI için kanonik (şarkı, sanatçı, albüm) kodlarını, URI'nin son dinlemesinden alır."""
+    size = len(table.dictionaries["uri"])
+    if np is not None:
+        uri = np.asarray(table["uri"])
+        last_row = np.full(size, -1, dtype=np.int64)
+        np.maximum.at(last_row, uri, np.arange(len(uri), dtype=np.int64))
+        seen = last_row >= 0
+        index = {}
+        for (name, fill), field in zip(_uri_index_fills(), URI_INDEX_FIELDS + URI_STAMP_FIELDS):
+            index[name] = np.full(size, fill, dtype=np.int32 if fill == -1 else np.int64)
+            index[name][seen] = np.asarray(table[field])[last_row[seen]]
+        return index
+
+    index = {name: array("i" if fill == -1 else "q", [fill]) * size for name, fill in _uri_index_fills()}
+    for row, uri in enumerate(table["uri"]):
+        for field in URI_INDEX_FIELDS + URI_STAMP_FIELDS:
+            index["uri_" + field][uri] = table[field][row]
+    return index
+
+
+def uri_index(table):
+    if "uri_track" not in table.indexes:
+        table.indexes.update(build_uri_index(table))
+    return table.indexes
+
+
+def _uri_group_keys(table):
+    # URI'si olmayan dinlemeler (ör. yerel dosyalar) şarkı adına göre ayrı gruplanır
+    uri_count = len(table.dictionaries["uri"])
+    null_code = table.dictionaries["uri"].lookup(None)
+    size = uri_count + len(table.dictionaries["track"])
+    if null_code is None:
+        return table["uri"], size, uri_count
+    if np is not None:
+        keys = np.asarray(table["uri"]).astype(np.int64)
+        missing = keys == null_code
+        keys[missing] = uri_count + np.asarray(table["track"])[missing]
+        return keys, size, uri_count
+    keys = array("q", (uri if uri != null_code else uri_count + track
+                       for uri, track in zip(table["uri"], table["track"])))
+    return keys, size, uri_count
+
+
+def _uri_key_codes(index, key, uri_count, last_artist, last_album):
+    # URI anahtarının (şarkı, sanatçı, albüm) kodları; URI'siz anahtarlar şarkı kodunu taşır
+    if key < uri_count:
+        return index["uri_track"][key], index["uri_artist"][key], index["uri_album"][key]
+    return key - uri_count, last_artist, last_album
+
+
+def analyze_by_uri(table, k=None):
+    """Şarkıları URI'ye göre toplar; aynı adlı farklı şarkılar ayrı kalır, adlar URI dizininden gelir."""
+    keys, size, uri_count = _uri_group_keys(table)
+    totals = group_codes("uri", keys, table["ms_played"], size, k)
+    index = uri_index(table)
+    tracks = table.dictionaries["track"]
+    artists = table.dictionaries["artist"]
+    albums = table.dictionaries["album"]
+    last_artists = gather(table["artist"], totals.last_row)
+    last_albums = gather(table["album"], totals.last_row)
+
+    rows = []
+    for key, minutes_played, last_artist, last_album in zip(
+            as_list(totals.codes), as_list(totals.minutes_played), last_artists, last_albums):
+        track, artist, album = _uri_key_codes(index, key, uri_count, last_artist, last_album)
+        rows.append({
+            "track_name": tracks.decode(track),
+            "minutes_played": minutes_played,
+            "artist_name": artists.decode(artist),
+            "album_name": albums.decode(album),
+        })
+    return rows
+
+
+def top_tracks(table, k):
+    return analyze_by_uri(table, k)
+
+
+def top_artists(table, k):
+    return analyze_group(table, "artist", k)
+
+
+def top_albums(table, k):
+    return analyze_group(table, "album", k)
+
+
+# Sanatçı → Albüm → Şarkı Hiyerarşisi
+class Rollup:
+    """Sanatçı, albüm ve şarkı toplamları; her düzeyin çocukları ebeveynin ardışık bir dilimindedir.
+
+    i. sanatçının albümleri artist_albums[i]:artist_albums[i + 1], j. albümün şarkıları
+    album_tracks[j]:album_tracks[j + 1] aralığındadır. Her dilim dakika azalan sıradadır.
+    *_codes sözlük kodlarıdır; albüm aynı adlı olsa da sanatçıya göre ayrı tutulur.
+    """
+
+    def __init__(self):
+        self.artist_codes, self.artist_minutes, self.artist_plays, self.artist_albums = [], [], [], [0]
+        self.album_codes, self.album_minutes, self.album_plays, self.album_tracks = [], [], [], [0]
+        self.track_codes, self.track_minutes, self.track_plays = [], [], []
+
+    def albums_of(self, artist):
+        return range(self.artist_albums[artist], self.artist_albums[artist + 1])
+
+    def tracks_of(self, album):
+        return range(self.album_tracks[album], self.album_tracks[album + 1])
+
+
+def rollup_hierarchy(table):
+    """Satırlar bir kez URI'ye göre toplanır; üst düzeyler yalnızca şarkı toplamlarından kurulur."""
+    keys, size, uri_count = _uri_group_keys(table)
+    totals = group_codes("uri", keys, table["ms_played"], size)
+    index = uri_index(table)
+    last_rows = as_list(totals.last_row)
+    last_artists = gather(table["artist"], last_rows)
+    last_albums = gather(table["album"], last_rows)
+
+    # sanatçı -> [dakika, dinleme, albüm -> [dakika, dinleme, [(şarkı, dakika, dinleme)]]]
+    artists = {}
+    for key, minutes, plays, last_artist, last_album in zip(
+            as_list(totals.codes), as_list(totals.minutes_played), as_list(totals.plays), last_artists, last_albums):
+        track, artist, album = _uri_key_codes(index, key, uri_count, last_artist, last_album)
+        artist_node = artists.setdefault(artist, [0, 0, {}])
+        artist_node[0] += minutes
+        artist_node[1] += plays
+        album_node = artist_node[2].setdefault(album, [0, 0, []])
+        album_node[0] += minutes
+        album_node[1] += plays
+        # Şarkılar dakika azalan geldiği için albüm içinde sıralı eklenir
+        album_node[2].append((track, minutes, plays))
+
+    rollup = Rollup()
+    # sorted kararlıdır; eşitlikte ilk görülen (en çok dinlenen şarkısı önce gelen) önde kalır
+    for artist, (minutes, plays, albums) in sorted(artists.items(), key=lambda item: -item[1][0]):
+        rollup.artist_codes.append(artist)
+        rollup.artist_minutes.append(minutes)
+        rollup.artist_plays.append(plays)
+        for album, (album_minutes, album_plays, tracks) in sorted(albums.items(), key=lambda item: -item[1][0]):
+            rollup.album_codes.append(album)
+            rollup.album_minutes.append(album_minutes)
+            rollup.album_plays.append(album_plays)
+            for track, track_minutes, track_plays in tracks:
+                rollup.track_codes.append(track)
+                rollup.track_minutes.append(track_minutes)
+                rollup.track_plays.append(track_plays)
+            rollup.album_tracks.append(len(rollup.track_codes))
+        rollup.artist_albums.append(len(rollup.album_codes))
+    return rollup
+
+
+# Zaman Küpü
+# Küp time_cube ile bir kez kurulur (arayüzde yükleme iş parçacığında) ve tablo açık kaldıkça saklanır.
+# Dilimler yerel saate göredir: ts'ye o günün UTC farkı eklenir, böylece UTC+3'teki bir dinleyicinin
+# saat dağılımı kaymaz. Dilim kimlikleri 1970-01-01 başlangıçlı tam sayılardır; haftalar Pazartesi başlar (ISO).
+TIME_GRAINS = ("year", "month", "week", "day", "hour")
+# Saat ve gün dilimleri neredeyse dinlem başına bir hücre üretir; bu yüzden şarkı ve albüm
+# boyutları yalnızca daha kaba dilimlerde tutulur.
+CUBE_LAYOUT = (
+    ("year", (None, "artist", "album", "track")),
+    ("month", (None, "artist", "album", "track")),
+    ("week", (None, "artist", "album", "track")),
+    ("day", (None, "artist")),
+    ("hour", (None, "artist")),
+)
+CUBE_PREFIX = "cube_"
+MS_PER_HOUR = 3_600_000
+MS_PER_DAY = 86_400_000
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _utc_offset_ms(ms):
+    try:
+        return time.localtime(ms // 1000).tm_gmtoff * 1000
+    except (OverflowError, OSError, ValueError):
+        return 0
+
+
+def _hour_offset_ms(hour):
+    # Saat içinde yaz saati geçişi yoksa farkı tüm saat için geçerlidir, varsa None
+    offset = _utc_offset_ms(hour * MS_PER_HOUR)
+    return offset if offset == _utc_offset_ms((hour + 1) * MS_PER_HOUR - 1000) else None
+
+
+def local_times(ts):
+    """UTC epoch milisaniyelerini, sistemin saat dilimindeki duvar saati milisaniyelerine çevirir.
+
+    Fark her UTC saati için bir kez sorulur; yalnızca yaz saati geçişi olan saatlerde dinleme başına.
+    """
+    if np is not None:
+        ts = np.asarray(ts)
+        hours, inverse = np.unique(ts // MS_PER_HOUR, return_inverse=True)
+        offsets = [_hour_offset_ms(int(hour)) for hour in hours]
+        local = ts + np.array([offset or 0 for offset in offsets], dtype=np.int64)[inverse.reshape(-1)]
+        changing = np.array([offset is None for offset in offsets], dtype=bool)[inverse.reshape(-1)]
+        for row in np.flatnonzero(changing):
+            local[row] = ts[row] + _utc_offset_ms(int(ts[row]))
+        return local
+    offsets = {}
+    local = array("q")
+    for value in ts:
+        hour = value // MS_PER_HOUR
+        if hour not in offsets:
+            offsets[hour] = _hour_offset_ms(hour)
+        offset = offsets[hour]
+        local.append(value + (_utc_offset_ms(value) if offset is None else offset))
+    return local
+
+
+def time_buckets(ts):
+    """Her dinlemenin (ts yerel saat milisaniyesi) tüm dilimlerdeki kimliğini döndürür: {dilim: dizi}."""
+    if np is not None:
+        ts = np.asarray(ts)
+        days = ts // MS_PER_DAY
+        moments = ts.astype("datetime64[ms]")
+        return {
+            "year": moments.astype("datetime64[Y]").astype(np.int64),
+            "month": moments.astype("datetime64[M]").astype(np.int64),
+            "week": (days + 3) // 7,
+            "day": days,
+            "hour": ts // MS_PER_HOUR,
+        }
+
+    buckets = {grain: array("q") for grain in TIME_GRAINS}
+    months = {}
+    for value in ts:
+        day = value // MS_PER_DAY
+        month = months.get(day)
+        if month is None:
+            d = date.fromordinal(_EPOCH_ORDINAL + day)
+            month = months[day] = (d.year - 1970) * 12 + d.month - 1
+        buckets["year"].append(month // 12)
+        buckets["month"].append(month)
+        buckets["week"].append((day + 3) // 7)
+        buckets["day"].append(day)
+        buckets["hour"].append(value // MS_PER_HOUR)
+    return buckets
+
+
+def bucket_of(grain, when):
+    """datetime değerinin verilen dilimdeki kimliği; saat dilimi yoksa yerel saat kabul edilir."""
+    if when.tzinfo is not None:
+        when = when.astimezone().replace(tzinfo=None)
+    if grain == "year":
+        return when.year - 1970
+    if grain == "month":
+        return (when.year - 1970) * 12 + when.month - 1
+    ms = to_epoch_ms(when)
+    if grain == "week":
+        return (ms // MS_PER_DAY + 3) // 7
+    if grain == "day":
+        return ms // MS_PER_DAY
+    return ms // MS_PER_HOUR
+
+
+def bucket_start(grain, bucket):
+    """Dilim kimliğinin başladığı an (yerel saat)."""
+    if grain == "year":
+        return datetime(1970 + bucket, 1, 1)
+    if grain == "month":
+        return datetime(1970 + bucket // 12, bucket % 12 + 1, 1)
+    if grain == "week":
+        return _EPOCH + timedelta(days=bucket * 7 - 3)
+    if grain == "day":
+        return _EPOCH + timedelta(days=bucket)
+    return _EPOCH + timedelta(hours=bucket)
+
+
+def _cube_cells(buckets, codes, size, ms_played):
+    """(dilim, kod) hücrelerini toplar; anahtar (dilim - taban) * size + kod olarak sıralıdır."""
+    if np is not None:
+        buckets = np.asarray(buckets)
+        ms_played = np.asarray(ms_played)
+        if not len(buckets):
+            empty = np.empty(0, dtype=np.int64)
+            return np.zeros(1, dtype=np.int64), empty, empty, empty
+        base = buckets.min()
+        combined = (buckets - base) * size
+        if codes is not None:
+            combined += np.asarray(codes)
+        span = int(buckets.max() - base + 1) * size
+        if span <= max(4 * len(combined), 1 << 20):
+            # Hücre uzayı küçükse yoğun bincount sıralamadan daha hızlıdır
+            plays = np.bincount(combined, minlength=span)
+            keys = np.flatnonzero(plays)
+            ms_sums = np.bincount(combined, weights=ms_played, minlength=span)[keys].astype(np.int64)
+            plays = plays[keys].astype(np.int64)
+        else:
+            keys, inverse = np.unique(combined, return_inverse=True)
+            ms_sums = np.bincount(inverse, weights=ms_played).astype(np.int64)
+            plays = np.bincount(inverse).astype(np.int64)
+        return np.array([base], dtype=np.int64), keys.astype(np.int64), ms_sums, plays
+
+    base = min(buckets) if len(buckets) else 0
+    cells = {}
+    if codes is None:
+        codes = [0] * len(buckets)
+    for bucket, code, ms in zip(buckets, codes, ms_played):
+        key = (bucket - base) * size + code
+        cell = cells.get(key)
+        if cell is None:
+            cells[key] = [ms, 1]
+        else:
+            cell[0] += ms
+            cell[1] += 1
+    keys = sorted(cells)
+    return (array("q", [base]), array("q", keys), array("q", (cells[key][0] for key in keys)),
+            array("q", (cells[key][1] for key in keys)))
+
+
+def _cube_name(grain, dimension):
+    return f"{CUBE_PREFIX}{grain}_{dimension or 'all'}"
+
+
+def build_time_cube(table):
+    """Dinlemeleri bir kez, yerel saate göre zaman dilimi × boyut hücrelerine toplar."""
+    buckets = time_buckets(local_times(table["ts"]))
+    indexes = {}
+    for grain, dimensions in CUBE_LAYOUT:
+        for dimension in dimensions:
+            size = 1 if dimension is None else len(table.dictionaries[dimension])
+            codes = None if dimension is None else table[dimension]
+            base, keys, ms_sums, plays = _cube_cells(buckets[grain], codes, size, table["ms_played"])
+            name = _cube_name(grain, dimension)
+            indexes[name + "_base"] = base
+            indexes[name + "_keys"] = keys
+            indexes[name + "_ms"] = ms_sums
+            indexes[name + "_plays"] = plays
+    return indexes
+
+
+class TimeCube:
+    """Zaman dilimli sorguları ham dinlemeleri taramadan, küp hücrelerini toplayarak yanıtlar.
+
+    start ve end datetime (saat dilimi yoksa yerel saat) değerleridir ve [start, end) aralığı dilim
+    sınırlarına yuvarlanır.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.indexes = table.indexes
+
+    def has(self, grain, dimension):
+        return _cube_name(grain, dimension) + "_keys" in self.indexes
+
+    def _slice(self, grain, dimension, start, end):
+        name = _cube_name(grain, dimension)
+        if name + "_keys" not in self.indexes:
+            raise KeyError(f"Küpte {grain} × {dimension or 'toplam'} hücresi yok")
+        base = int(self.indexes[name + "_base"][0])
+        keys = self.indexes[name + "_keys"]
+        size = 1 if dimension is None else len(self.table.dictionaries[dimension])
+        lo = 0 if start is None else bisect_left(keys, (bucket_of(grain, start) - base) * size)
+        hi = len(keys) if end is None else bisect_left(keys, (bucket_of(grain, end) - base) * size)
+        return (base, size, keys[lo:hi], self.indexes[name + "_ms"][lo:hi],
+                self.indexes[name + "_plays"][lo:hi])
+
+    def totals(self, grain, dimension, start=None, end=None):
+        """Aralıktaki hücreleri boyut koduna göre toplar: (ms dizisi, dinleme sayısı dizisi)."""
+        _, size, keys, ms_sums, plays = self._slice(grain, dimension, start, end)
+        if np is not None:
+            codes = np.asarray(keys) % size
+            return (np.bincount(codes, weights=ms_sums, minlength=size).astype(np.int64),
+                    np.bincount(codes, weights=plays, minlength=size).astype(np.int64))
+        ms_totals = [0] * size
+        play_totals = [0] * size
+        for key, ms, count in zip(keys, ms_sums, plays):
+            ms_totals[key % size] += ms
+            play_totals[key % size] += count
+        return ms_totals, play_totals
+
+    def top(self, grain, dimension, k=10, start=None, end=None):
+        """Örn. top("month", "artist", 10, datetime(2023, 3, 1), datetime(2023, 4, 1))."""
+        ms_totals, play_totals = self.totals(grain, dimension, start, end)
+        present = [code for code, count in enumerate(as_list(play_totals)) if count]
+        ms_list = as_list(ms_totals)
+        order = top_k_order([ms_list[code] for code in present], k, present)
+        dictionary = self.table.dictionaries[dimension]
+        return [
+            {
+                f"{dimension}_name": dictionary.decode(present[i]),
+                "minutes_played": ms_list[present[i]] // 60000,
+                "ms_played": ms_list[present[i]],
+            }
+            for i in as_list(order)
+        ]
+
+    def series(self, grain, start=None, end=None):
+        """Her dilimin başlangıcı ve toplam dinleme süresi (ms): [(datetime, ms), ...]."""
+        base, _, keys, ms_sums, _ = self._slice(grain, None, start, end)
+        return [(bucket_start(grain, base + key), ms) for key, ms in zip(as_list(keys), as_list(ms_sums))]
+
+    def hour_of_day(self, start=None, end=None):
+        """Günün her saati (yerel saat, 0-23) için toplam dinleme süresi (ms)."""
+        base, _, keys, ms_sums, _ = self._slice("hour", None, start, end)
+        hours = [0] * 24
+        for key, ms in zip(as_list(keys), as_list(ms_sums)):
+            hours[(base + key) % 24] += ms
+        return hours
+
+
+def time_cube(table):
+    if not any(name.startswith(CUBE_PREFIX) for name in table.indexes):
+        table.indexes.update(build_time_cube(table))
+    return TimeCube(table)
+
+
+# Dinleme Oturumları
+# ts dinlemenin bittiği andır; başlangıç ts - ms_played olarak alınır.
+DEFAULT_SESSION_GAP_MS = 30 * 60_000
+
+
+class Sessions:
+    """Kronolojik dinleme akışından çıkarılan oturumlar; her alan oturum başına bir dizidir.
+
+    start ve end epoch milisaniyesi, duration milisaniyedir. artist oturumda en uzun
+    dinlenen sanatçının kodudur.
+    """
+
+    def __init__(self, start, end, duration, tracks, artist, first_row):
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.tracks = tracks
+        self.artist = artist
+        self.first_row = first_row
+
+    def __len__(self):
+        return len(self.start)
+
+
+def detect_sessions(table, idle_gap_ms=DEFAULT_SESSION_GAP_MS):
+    """Önceki dinlemenin bitişi ile sonrakinin başlangıcı arasındaki boşluk idle_gap_ms'yi aşınca yeni oturum başlar.
+
+    Tablonun ts'ye göre sıralı olduğu varsayılır (load_history_table sıralar).
+    """
+    if np is not None:
+        return _detect_sessions_numpy(table, idle_gap_ms)
+    return _detect_sessions_python(table, idle_gap_ms)
+
+
+def _detect_sessions_numpy(table, idle_gap_ms):
+    ts = np.asarray(table["ts"])
+    ms_played = np.asarray(table["ms_played"]).astype(np.int64)
+    artists = np.asarray(table["artist"]).astype(np.int64)
+    if not len(ts):
+        empty = np.empty(0, dtype=np.int64)
+        return Sessions(empty, empty, empty, empty, empty, empty)
+
+    starts = ts - ms_played
+    new_session = np.empty(len(ts), dtype=bool)
+    new_session[0] = True
+    new_session[1:] = starts[1:] - ts[:-1] > idle_gap_ms
+    first_row = np.flatnonzero(new_session)
+
+    session_start = np.minimum.reduceat(starts, first_row)
+    session_end = np.maximum.reduceat(ts, first_row)
+    tracks = np.diff(np.append(first_row, len(ts)))
+
+    # (oturum, sanatçı) çiftlerinin süreleri; her oturumda en büyük çift seçilir
+    session_ids = np.cumsum(new_session) - 1
+    artist_count = max(len(table.dictionaries["artist"]), 1)
+    pair_keys = session_ids * artist_count + artists
+    order = np.argsort(pair_keys, kind="stable")
+    sorted_keys = pair_keys[order]
+    pair_first = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    pair_keys = sorted_keys[pair_first]
+    pair_ms = np.add.reduceat(ms_played[order], pair_first)
+    pair_sessions = pair_keys // artist_count
+    best = np.lexsort((pair_keys % artist_count, -pair_ms, pair_sessions))
+    best = best[np.r_[True, pair_sessions[best][1:] != pair_sessions[best][:-1]]]
+
+    return Sessions(session_start, session_end, session_end - session_start, tracks,
+                    pair_keys[best] % artist_count, first_row)
+
+
+def _detect_sessions_python(table, idle_gap_ms):
+    session_start, session_end, tracks, artist, first_row = (array("q") for _ in range(5))
+    artist_ms = {}
+
+    def close():
+        artist.append(min(artist_ms, key=lambda code: (-artist_ms[code], code)))
+        artist_ms.clear()
+
+    previous_end = None
+    for row, (ts, ms, code) in enumerate(zip(table["ts"], table["ms_played"], table["artist"])):
+        start = ts - ms
+        if previous_end is None or start - previous_end > idle_gap_ms:
+            if previous_end is not None:
+                close()
+            session_start.append(start)
+            session_end.append(ts)
+            tracks.append(0)
+            first_row.append(row)
+        session_start[-1] = min(session_start[-1], start)
+        session_end[-1] = max(session_end[-1], ts)
+        tracks[-1] += 1
+        artist_ms[code] = artist_ms.get(code, 0) + ms
+        previous_end = ts
+    if previous_end is not None:
+        close()
+
+    duration = array("q", (end - start for start, end in zip(session_start, session_end)))
+    return Sessions(session_start, session_end, duration, tracks, artist, first_row)
+
+
+def analyze_sessions(table, idle_gap_ms=DEFAULT_SESSION_GAP_MS, k=None):
+    """Oturumları en uzundan kısaya satırlar olarak döndürür; k verilirse yalnızca en uzun k oturum."""
+    sessions = detect_sessions(table, idle_gap_ms)
+    order = top_k_order(sessions.duration, k, sessions.first_row)
+    artists = table.dictionaries["artist"]
+    return [
+        {
+            "start": _EPOCH + timedelta(milliseconds=start),
+            "end": _EPOCH + timedelta(milliseconds=end),
+            "minutes": duration // 60000,
+            "track_count": count,
+            "artist_name": artists.decode(code),
+        }
+        for start, end, duration, count, code in zip(
+            gather(sessions.start, order), gather(sessions.end, order), gather(sessions.duration, order),
+            gather(sessions.tracks, order), gather(sessions.artist, order),
+        )
+    ]
+
+
+# Atlama ve Bitiş Nedeni Analizi
+class BehaviourTotals:
+    """Kodlu sütunlardan sayılan atlama, bitiş nedeni ve karışık çalma toplamları.
+
+    track_* dizileri _uri_group_keys anahtarlarıyla, artist_* sanatçı koduyla, reason_*
+    reason_end koduyla indekslidir. shuffle_ms [sıralı, karışık] dinleme süresidir.
+    """
+
+    def __init__(self, track_plays, track_skips, track_last_row, artist_plays, artist_skips,
+                 reason_plays, reason_ms, shuffle_ms, uri_count):
+        self.track_plays = track_plays
+        self.track_skips = track_skips
+        self.track_last_row = track_last_row
+        self.artist_plays = artist_plays
+        self.artist_skips = artist_skips
+        self.reason_plays = reason_plays
+        self.reason_ms = reason_ms
+        self.shuffle_ms = shuffle_ms
+        self.uri_count = uri_count
+
+
+def behaviour_totals(table):
+    """Tüm metrikleri, metin karşılaştırması yapmadan tamsayı kodları sayarak tek seferde hesaplar."""
+    keys, size, uri_count = _uri_group_keys(table)
+    artist_count = len(table.dictionaries["artist"])
+    reason_count = len(table.dictionaries["reason_end"])
+    if np is not None:
+        keys = np.asarray(keys)
+        artists = np.asarray(table["artist"])
+        reasons = np.asarray(table["reason_end"])
+        skipped = np.asarray(table["skipped"]).astype(np.int64)
+        shuffle = np.asarray(table["shuffle"]).astype(np.int64)
+        ms_played = np.asarray(table["ms_played"])
+        last_row = np.full(size, -1, dtype=np.int64)
+        np.maximum.at(last_row, keys, np.arange(len(keys), dtype=np.int64))
+        return BehaviourTotals(
+            np.bincount(keys, minlength=size),
+            np.bincount(keys, weights=skipped, minlength=size).astype(np.int64),
+            last_row,
+            np.bincount(artists, minlength=artist_count),
+            np.bincount(artists, weights=skipped, minlength=artist_count).astype(np.int64),
+            np.bincount(reasons, minlength=reason_count),
+            np.bincount(reasons, weights=ms_played, minlength=reason_count).astype(np.int64),
+            np.bincount(shuffle, weights=ms_played, minlength=2).astype(np.int64),
+            uri_count,
+        )
+
+    track_plays, track_skips, track_last_row = [0] * size, [0] * size, [-1] * size
+    artist_plays, artist_skips = [0] * artist_count, [0] * artist_count
+    reason_plays, reason_ms = [0] * reason_count, [0] * reason_count
+    shuffle_ms = [0, 0]
+    for row, (key, artist, reason, skipped, shuffle, ms) in enumerate(zip(
+            keys, table["artist"], table["reason_end"], table["skipped"], table["shuffle"], table["ms_played"])):
+        track_plays[key] += 1
+        track_skips[key] += skipped
+        track_last_row[key] = row
+        artist_plays[artist] += 1
+        artist_skips[artist] += skipped
+        reason_plays[reason] += 1
+        reason_ms[reason] += ms
+        shuffle_ms[shuffle] += ms
+    return BehaviourTotals(track_plays, track_skips, track_last_row, artist_plays, artist_skips,
+                           reason_plays, reason_ms, shuffle_ms, uri_count)
+
+
+def _skip_order(plays, skips, k, min_plays):
+    # En az min_plays kez dinlenenler atlama oranına göre azalan, eşitlikte çok dinlenen önce
+    plays = as_list(plays)
+    skips = as_list(skips)
+    present = [code for code, count in enumerate(plays) if count and count >= min_plays]
+    order = top_k_order([skips[code] / plays[code] for code in present], k, [-plays[code] for code in present])
+    return [present[i] for i in as_list(order)], plays, skips
+
+
+def analyze_behaviour(table, k=None, min_plays=1):
+    """Şarkı ve sanatçı atlama oranları, bitiş nedeni dağılımı ve karışık/sıralı dinleme süresi."""
+    totals = behaviour_totals(table)
+    index = uri_index(table)
+    tracks = table.dictionaries["track"]
+    artists = table.dictionaries["artist"]
+
+    track_keys, plays, skips = _skip_order(totals.track_plays, totals.track_skips, k, min_plays)
+    last_rows = as_list(totals.track_last_row)
+    last_artists = gather(table["artist"], [last_rows[key] for key in track_keys])
+    track_rows = []
+    for key, last_artist in zip(track_keys, last_artists):
+        track, artist, _ = _uri_key_codes(index, key, totals.uri_count, last_artist, None)
+        track_rows.append({
+            "track_name": tracks.decode(track),
+            "artist_name": artists.decode(artist),
+            "plays": plays[key],
+            "skips": skips[key],
+            "skip_rate": skips[key] / plays[key],
+        })
+
+    artist_codes, plays, skips = _skip_order(totals.artist_plays, totals.artist_skips, k, min_plays)
+    artist_rows = [
+        {"artist_name": artists.decode(code), "plays": plays[code], "skips": skips[code],
+         "skip_rate": skips[code] / plays[code]}
+        for code in artist_codes
+    ]
+
+    reasons = table.dictionaries["reason_end"]
+    reason_plays = as_list(totals.reason_plays)
+    reason_ms = as_list(totals.reason_ms)
+    reason_codes = [code for code, count in enumerate(reason_plays) if count]
+    reason_rows = [
+        {"reason": reasons.decode(reason_codes[i]), "plays": reason_plays[reason_codes[i]],
+         "minutes_played": reason_ms[reason_codes[i]] // 60000}
+        for i in as_list(top_k_order([reason_plays[code] for code in reason_codes], None, reason_codes))
+    ]
+
+    ordered_ms, shuffle_ms = as_list(totals.shuffle_ms)
+    return {
+        "tracks": track_rows,
+        "artists": artist_rows,
+        "reason_end": reason_rows,
+        "shuffle_ms": shuffle_ms,
+        "ordered_ms": ordered_ms,
+    }
+
+
+# Filtre Dili
+# Örn: artist = "Little Mix" and year >= 2022 and not skipped and platform ~ "android"
+# İfade bir kez ayrıştırılır; NumPy ile sütun maskelerine, NumPy yoksa tek bir derlenmiş
+# Python fonksiyonuna çevrilir. Satır başına sözdizimi ağacı yorumlanmaz.
+TEXT_FILTER_FIELDS = ("artist", "album", "track", "platform", "reason_start", "reason_end")
+TIME_FILTER_FIELDS = ("year", "month", "date")
+ORDERED_FILTER_FIELDS = TIME_FILTER_FIELDS + ("hour", "ms_played")
+
+_FILTER_TOKEN = re.compile(r"""\s*(?:(?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|(?P<number>\d+)"""
+                           r"""|(?P<op>!=|<=|>=|=|<|>|~|\(|\))|(?P<word>\w+))""")
+
+
+class FilterError(ValueError):
+    pass
+
+
+def _tokenize_filter(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _FILTER_TOKEN.match(text, position)
+        if match is None:
+            raise FilterError(f"Anlaşılmayan ifade: {text[position:].strip()[:20]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        elif kind == "number":
+            value = int(value)
+        elif kind == "word" and value.lower() in ("and", "or", "not"):
+            kind, value = "op", value.lower()
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _FilterParser:
+    """Özyinelemeli iniş: or < and < not < karşılaştırma/parantez."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expect(self, kind, value=None):
+        token = self.next()
+        if token[0] != kind or (value is not None and token[1] != value):
+            raise FilterError(f"Beklenen {value or kind}, bulunan {token[1]!r}")
+        return token[1]
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek()[0] is not None:
+            raise FilterError(f"Fazladan ifade: {self.peek()[1]!r}")
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.peek() == ("op", "or"):
+            self.next()
+            node = ("or", node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.peek() == ("op", "and"):
+            self.next()
+            node = ("and", node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if self.peek() == ("op", "not"):
+            self.next()
+            return ("not", self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        if self.peek() == ("op", "("):
+            self.next()
+            node = self.parse_or()
+            self.expect("op", ")")
+            return node
+
+        field = self.expect("word").lower()
+        if field in FLAG_FIELDS:
+            if self.peek() in (("op", "="), ("op", "!=")):
+                negate = self.next()[1] == "!="
+                value = self.next()[1]
+                if str(value).lower() not in ("1", "0", "true", "false"):
+                    raise FilterError(f"{field} yalnızca true/false ile karşılaştırılabilir")
+                node = ("flag", field)
+                return ("not", node) if negate == (str(value).lower() in ("1", "true")) else node
+            return ("flag", field)
+
+        op = self.expect("op")
+        if op not in ("=", "!=", "~", "<", "<=", ">", ">="):
+            raise FilterError(f"{field} alanından sonra karşılaştırma bekleniyordu")
+        kind, value = self.next()
+        if kind not in ("string", "number"):
+            raise FilterError(f"{field} {op} ardından değer bekleniyordu")
+
+        if field in TEXT_FILTER_FIELDS:
+            if op not in ("=", "!=", "~"):
+                raise FilterError(f"{field} için yalnızca =, != ve ~ kullanılabilir")
+            node = ("text", field, "~" if op == "~" else "=", str(value))
+            return ("not", node) if op == "!=" else node
+        if field in ORDERED_FILTER_FIELDS:
+            if op == "~":
+                raise FilterError(f"{field} için ~ kullanılamaz")
+            lo, hi = _filter_bounds(field, value)
+            column = "ts" if field in TIME_FILTER_FIELDS else field
+            # Her değer [lo, hi) aralığıdır; karşılaştırmalar aralık sınırlarına çevrilir
+            node = {"=": (lo, hi), "!=": (lo, hi), "<": (None, lo), "<=": (None, hi),
+                    ">": (hi, None), ">=": (lo, None)}[op]
+            node = ("range", column, node[0], node[1])
+            return ("not", node) if op == "!=" else node
+        raise FilterError(f"Bilinmeyen alan: {field}")
+
+
+def _filter_bounds(field, value):
+    try:
+        if field == "year":
+            year = int(value)
+            return to_epoch_ms(datetime(year, 1, 1)), to_epoch_ms(datetime(year + 1, 1, 1))
+        if field == "month":
+            start = datetime.strptime(str(value), "%Y-%m")
+            end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+            return to_epoch_ms(start), to_epoch_ms(end)
+        if field == "date":
+            start = datetime.strptime(str(value), "%Y-%m-%d")
+            return to_epoch_ms(start), to_epoch_ms(start + timedelta(days=1))
+        return int(value), int(value) + 1
+    except (TypeError, ValueError):
+        raise FilterError(f"{field} için geçersiz değer: {value!r}") from None
+
+
+def parse_filter(text):
+    """Filtre metnini sözdizimi ağacına çevirir; hatalı ifadede FilterError fırlatır."""
+    tokens = _tokenize_filter(text)
+    if not tokens:
+        raise FilterError("Filtre boş")
+    return _FilterParser(tokens).parse()
+
+
+def _matching_codes(dictionary, op, value):
+    if op == "=":
+        code = dictionary.lookup(value)
+        return [] if code is None else [code]
+    needle = value.casefold()
+    return [code for code, text in enumerate(dictionary.values) if text is not None and needle in text.casefold()]
+
+
+def _filter_mask_numpy(node, table):
+    kind = node[0]
+    if kind == "or":
+        return _filter_mask_numpy(node[1], table) | _filter_mask_numpy(node[2], table)
+    if kind == "and":
+        return _filter_mask_numpy(node[1], table) & _filter_mask_numpy(node[2], table)
+    if kind == "not":
+        return ~_filter_mask_numpy(node[1], table)
+    if kind == "flag":
+        return np.asarray(table[node[1]]).astype(bool)
+    if kind == "text":
+        _, field, op, value = node
+        codes = _matching_codes(table.dictionaries[field], op, value)
+        if op == "=":
+            return np.asarray(table[field]) == (codes[0] if codes else -1)
+        matches = np.zeros(len(table.dictionaries[field]), dtype=bool)
+        matches[codes] = True
+        return matches[np.asarray(table[field])]
+
+    _, column, lo, hi = node
+    values = np.asarray(table["ts"]) // MS_PER_HOUR % 24 if column == "hour" else np.asarray(table[column])
+    mask = np.ones(len(values), dtype=bool)
+    if lo is not None:
+        mask &= values >= lo
+    if hi is not None:
+        mask &= values < hi
+    return mask
+
+
+def _filter_source(node, table, namespace, columns):
+    """Ağacı tek bir Python ifadesine çevirir; kullanılan sütun adları columns'a eklenir."""
+    kind = node[0]
+    if kind in ("or", "and"):
+        return f"({_filter_source(node[1], table, namespace, columns)} {kind} " \
+               f"{_filter_source(node[2], table, namespace, columns)})"
+    if kind == "not":
+        return f"(not {_filter_source(node[1], table, namespace, columns)})"
+    if kind == "flag":
+        columns.add(node[1])
+        return node[1]
+    if kind == "text":
+        _, field, op, value = node
+        columns.add(field)
+        codes = _matching_codes(table.dictionaries[field], op, value)
+        if op == "=":
+            return f"({field} == {codes[0] if codes else -1})"
+        # Eşleşen kodlar bir bayt tablosuna yazılır; satırda yalnızca indeksleme yapılır
+        name = f"_codes{len(namespace)}"
+        lookup = bytearray(len(table.dictionaries[field]))
+        for code in codes:
+            lookup[code] = 1
+        namespace[name] = lookup
+        return f"{name}[{field}]"
+
+    _, column, lo, hi = node
+    if column == "hour":
+        columns.add("ts")
+        value = f"(ts // {MS_PER_HOUR} % 24)"
+    else:
+        columns.add(column)
+        value = column
+    if lo is not None and hi is not None:
+        return f"({lo} <= {value} < {hi})"
+    return f"({value} >= {lo})" if lo is not None else f"({value} < {hi})"
+
+
+def filter_mask(table, expression):
+    """İfadeyi tabloya göre bir kez derler ve her satır için eşleşme maskesini döndürür."""
+    node = parse_filter(expression) if isinstance(expression, str) else expression
+    if np is not None:
+        return _filter_mask_numpy(node, table)
+    namespace = {}
+    columns = set()
+    source = _filter_source(node, table, namespace, columns)
+    columns = sorted(columns)
+    predicate = eval(compile(f"lambda {', '.join(columns)}: {source}", "<filtre>", "eval"), namespace)
+    return list(map(predicate, *(table[column] for column in columns)))
+
+
+def filter_table(table, expression):
+    """İfadeye uyan dinlemelerden oluşan tablo; satır sırası (ve zaman sıralaması) korunur."""
+    return table.take(filter_mask(table, expression))
+
+
+# Ad Arama Dizini
+# Adlar büyük/küçük harf ve aksan farkı gözetmeden aranır: "Şebnem" ~ "sebnem", "IŞIK" ~ "isik".
+SEARCH_FIELDS = ("track", "artist", "album")
+# Daha kısa sorgular trigram listesi kullanamaz ve tüm ad metnini tarar; arayüz bu uzunluktan itibaren arar
+MIN_SEARCH_LENGTH = 3
+_COMBINING_RANGES = ((0x0300, 0x036f), (0x1ab0, 0x1aff), (0x1dc0, 0x1dff), (0x20d0, 0x20ff), (0xfe20, 0xfe2f))
+_COMBINING_MARKS = re.compile("[" + "".join(f"{chr(lo)}-{chr(hi)}" for lo, hi in _COMBINING_RANGES) + "]")
+
+
+def _strip_marks(text):
+    if np is None or len(text) < 4096:
+        return _COMBINING_MARKS.sub("", text)
+    points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    marks = np.zeros(len(points), dtype=bool)
+    for lo, hi in _COMBINING_RANGES:
+        marks |= (points >= lo) & (points <= hi)
+    return points[~marks].tobytes().decode("utf-32-le")
+
+
+def normalize_text(text):
+    """Harfleri küçültür ve aksanları atar; "İ" küçültülünce "i" + nokta olur, nokta da atılır."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return _strip_marks(text).replace("ı", "i")
+
+
+def normalize_texts(texts):
+    # Tüm adlar tek metin olarak normalize edilir; ad başına Python döngüsünden çok daha hızlıdır
+    joined = "\x00".join(texts)
+    if joined.count("\x00") != max(len(texts) - 1, 0):
+        return [normalize_text(text) for text in texts]
+    return normalize_text(joined).split("\x00") if texts else []
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _trigram_id(trigram):
+    # Kod noktaları 21 bite sığar; üç harf tek bir 63 bitlik tamsayıya paketlenir
+    return (ord(trigram[0]) << 42) | (ord(trigram[1]) << 21) | ord(trigram[2])
+
+
+class NameIndex:
+    """Farklı şarkı, sanatçı ve albüm adları üzerinde üçlü harf (trigram) ters dizini.
+
+    Normalize edilmiş adlar "\\x00" ile ayrılmış tek bir metinde tutulur. Sorgunun en seyrek
+    trigramının listesi aday kümesidir; adaylar adda alt metin olarak doğrulanır. Listeler
+    sıkıştırılmış biçimdedir (sıralı trigram kimlikleri + başlangıç konumları + ad numaraları),
+    böylece dizin arşive diziler halinde yazılır; yeni adlar extend ile mevcut listelere eklenir.
+    Üç harften kısa sorgular birleşik metinde doğrudan aranır.
+    """
+
+    def __init__(self, dictionaries=None):
+        self.fields = _to_column(array("B"))
+        self.codes = _to_column(array("i"))
+        self.text = ""
+        # starts[i]: i. adın metindeki başlangıcı; son eleman metnin sonunu gösterir
+        self.starts = _to_column(array("q", [0]))
+        # sizes: dizine katılmış sözlük uzunlukları (şarkı, sanatçı, albüm); sonraki kodlar yenidir
+        self.sizes = _to_column(array("q", [0] * len(SEARCH_FIELDS)))
+        self.trigram_ids = _to_column(array("q"))
+        self.offsets = _to_column(array("q", [0]))
+        self.entries = _to_column(array("i"))
+        self._points = None
+        if dictionaries is not None:
+            self.extend(dictionaries)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def extend(self, dictionaries):
+        """Sözlüklere sonradan eklenen adları dizine katar; var olan adlar yeniden normalize edilmez.
+
+        Sözlükler yalnızca sona eklenerek büyüdüğü için yeni adlar sizes'tan sonraki kodlardır.
+        """
+        fields = array("B")
+        codes = array("i")
+        values = []
+        for field_id, field in enumerate(SEARCH_FIELDS):
+            names = dictionaries[field].values
+            present = [code for code in range(int(self.sizes[field_id]), len(names)) if names[code] is not None]
+            fields.extend(array("B", [field_id]) * len(present))
+            codes.extend(array("i", present))
+            values.extend([names[code] for code in present])
+        self.sizes = _to_column(array("q", [len(dictionaries[field]) for field in SEARCH_FIELDS]))
+        if not values:
+            return
+
+        first = len(self)
+        names = normalize_texts(values)
+        text = "\x00".join(names)
+        self.text = self.text + "\x00" + text if first else text
+        starts = array("q")
+        end = int(self.starts[-1])
+        for name in names:
+            end += len(name) + 1
+            starts.append(end)
+        self.fields = _concat_columns([self.fields, _to_column(fields)])
+        self.codes = _concat_columns([self.codes, _to_column(codes)])
+        self.starts = _concat_columns([self.starts, _to_column(starts)])
+        self._points = None
+        if np is not None:
+            self._extend_numpy(text, first)
+        else:
+            self._extend_python(names, first)
+
+    def _extend_numpy(self, text, first):
+        # Yeni adların tüm (trigram, ad) çiftleri vektörel üretilir ve trigrama göre sıralanır
+        points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+        separator = points == 0
+        entries = first + np.cumsum(separator)[:-2] if len(points) > 2 else np.empty(0, dtype=np.int64)
+        ids = (points[:-2] << 42) | (points[1:-1] << 21) | points[2:]
+        valid = ~(separator[:-2] | separator[1:-1] | separator[2:])
+        ids = ids[valid]
+        entries = entries[valid]
+        # Kararlı sıralama her trigram içinde ad sırasını korur
+        order = np.argsort(ids, kind="stable")
+        ids = ids[order]
+        entries = entries[order]
+        keep = np.ones(len(ids), dtype=bool)
+        keep[1:] = (ids[1:] != ids[:-1]) | (entries[1:] != entries[:-1])
+        ids = ids[keep]
+        entries = entries[keep].astype(np.int32)
+
+        # Mevcut listelere eklenir: yeni ad numaraları eskilerden büyük olduğu için her listenin sonuna düşer
+        old_ids = np.repeat(np.asarray(self.trigram_ids), np.diff(self.offsets))
+        at = np.searchsorted(old_ids, ids, side="right")
+        ids = np.insert(old_ids, at, ids)
+        self.entries = np.insert(np.asarray(self.entries), at, entries)
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if len(ids) else np.empty(0, dtype=np.int64)
+        self.trigram_ids = ids[starts]
+        self.offsets = np.append(starts, len(ids)).astype(np.int64)
+
+    def _extend_python(self, names, first):
+        postings = {trigram_id: array("i", self.entries[self.offsets[i]:self.offsets[i + 1]])
+                    for i, trigram_id in enumerate(self.trigram_ids)}
+        for entry, name in enumerate(names, first):
+            for trigram in _trigrams(name):
+                trigram_id = _trigram_id(trigram)
+                posting = postings.get(trigram_id)
+                if posting is None:
+                    posting = postings[trigram_id] = array("i")
+                posting.append(entry)
+        self.trigram_ids = array("q", sorted(postings))
+        self.offsets = array("q", [0])
+        self.entries = array("i")
+        for trigram_id in self.trigram_ids:
+            self.entries.extend(postings[trigram_id])
+            self.offsets.append(len(self.entries))
+
+    def to_indexes(self):
+        """Arşive yazılacak diziler; from_indexes ile yeniden kurmadan açılır."""
+        text = self.text.encode("utf-8")
+        return {
+            "names_fields": self.fields,
+            "names_codes": self.codes,
+            "names_starts": self.starts,
+            "names_sizes": self.sizes,
+            "names_text": np.frombuffer(text, dtype=np.uint8) if np is not None else array("B", text),
+            "names_trigrams": self.trigram_ids,
+            "names_offsets": self.offsets,
+            "names_entries": self.entries,
+        }
+
+    @classmethod
+    def from_indexes(cls, indexes):
+        """Arşivdeki dizilerden açar; yalnızca ad metni çözülür, normalize etme ve sıralama yapılmaz."""
+        index = cls()
+        index.fields = indexes["names_fields"]
+        index.codes = indexes["names_codes"]
+        index.starts = indexes["names_starts"]
+        index.sizes = indexes["names_sizes"]
+        index.text = bytes(indexes["names_text"]).decode("utf-8")
+        index.trigram_ids = indexes["names_trigrams"]
+        index.offsets = indexes["names_offsets"]
+        index.entries = indexes["names_entries"]
+        return index
+
+    def _posting(self, trigram):
+        trigram_id = _trigram_id(trigram)
+        if np is not None:
+            i = int(np.searchsorted(self.trigram_ids, trigram_id))
+        else:
+            i = bisect_left(self.trigram_ids, trigram_id)
+        if i == len(self.trigram_ids) or self.trigram_ids[i] != trigram_id:
+            return None
+        return self.entries[self.offsets[i]:self.offsets[i + 1]]
+
+    def _scan(self, needle, limit):
+        if np is not None and limit is None:
+            # Kısa sorgu kod noktası dizisinde vektörel aranır; konumlar ikili aramayla ada çevrilir
+            if self._points is None:
+                self._points = np.frombuffer(self.text.encode("utf-32-le"), dtype=np.uint32)
+            points = self._points
+            size = len(points) - len(needle) + 1
+            hits = points[:size] == ord(needle[0])
+            for offset, ch in enumerate(needle[1:], 1):
+                hits &= points[offset:offset + size] == ord(ch)
+            starts = np.asarray(self.starts, dtype=np.int64)
+            entries = np.unique(np.searchsorted(starts, np.flatnonzero(hits), side="right") - 1)
+            return entries.tolist()
+
+        # Eşleşme C içinde aranır, bulunan adın geri kalanı atlanır
+        text, starts = self.text, self.starts
+        entries = []
+        position = text.find(needle)
+        while position >= 0 and (limit is None or len(entries) < limit):
+            entry = bisect_left(starts, position + 1) - 1
+            entries.append(entry)
+            position = text.find(needle, starts[entry + 1])
+        return entries
+
+    def search(self, query, limit=None):
+        """Sorguyu içeren adları (alan, kod) çiftleri olarak döndürür."""
+        needle = normalize_text(query.strip())
+        if not needle:
+            return []
+        if len(needle) < 3:
+            entries = self._scan(needle, limit)
+        else:
+            candidates = None
+            for trigram in _trigrams(needle):
+                posting = self._posting(trigram)
+                if posting is None:
+                    return []
+                if candidates is None or len(posting) < len(candidates):
+                    candidates = posting
+            text, starts = self.text, self.starts
+            entries = [entry for entry in as_list(candidates)
+                       if text.find(needle, starts[entry], starts[entry + 1] - 1) >= 0]
+        if limit is not None:
+            entries = entries[:limit]
+        return [(SEARCH_FIELDS[self.fields[entry]], int(self.codes[entry])) for entry in entries]
+
+
+def build_name_index(table):
+    """Ad dizinini kurar ve arşive yazılacak dizilerini tablonun dizinlerine ekler."""
+    table.name_index = NameIndex(table.dictionaries)
+    table.indexes.update(table.name_index.to_indexes())
+    return table.name_index
+
+
+def name_index(table):
+    if table.name_index is None:
+        if "names_trigrams" in table.indexes:
+            table.name_index = NameIndex.from_indexes(table.indexes)
+        else:
+            build_name_index(table)
+    return table.name_index
+
+
+def search_mask(table, query):
+    """Şarkı, sanatçı veya albüm adı sorguyu içeren dinlemelerin maskesi."""
+    matches = {field: [] for field in SEARCH_FIELDS}
+    for field, code in name_index(table).search(query):
+        matches[field].append(code)
+    if np is not None:
+        mask = np.zeros(len(table), dtype=bool)
+        for field, codes in matches.items():
+            if codes:
+                lookup = np.zeros(len(table.dictionaries[field]), dtype=bool)
+                lookup[codes] = True
+                mask |= lookup[np.asarray(table[field])]
+        return mask
+    lookups = {}
+    for field, codes in matches.items():
+        if codes:
+            lookups[field] = bytearray(len(table.dictionaries[field]))
+            for code in codes:
+                lookups[field][code] = 1
+    if not lookups:
+        return [False] * len(table)
+    return [any(values) for values in zip(*(map(lookup.__getitem__, table[field]) for field, lookup in lookups.items()))]
+
+
+# Sonuç Sıralama
+# Türkçe alfabe sırası; q, w, x Latin alfabesindeki yerlerine eklenir.
+TURKISH_ALPHABET = "abcçdefgğhıijklmnoöpqrsştuüvwxyz"
+# Harfler, rakam ve noktalama işaretlerinden sonra gelecek şekilde özel kullanım alanına eşlenir
+_TURKISH_LETTERS = str.maketrans({ch: chr(0xE000 + rank) for rank, ch in enumerate(TURKISH_ALPHABET) if ch not in "abcdefghijklmnopqrstuvwxyz"})
+_LATIN_LETTERS = str.maketrans({ch: chr(0xE000 + rank) for rank, ch in enumerate(TURKISH_ALPHABET) if ch in "abcdefghijklmnopqrstuvwxyz"})
+
+
+def turkish_sort_key(text):
+    """Türkçe sıralama anahtarı: ı < i, ç c'den sonra, ş s'den sonra; diğer aksanlar yok sayılır."""
+    if text is None:
+        return ""
+    text = unicodedata.normalize("NFC", str(text).replace("I", "ı").replace("İ", "i")).lower()
+    # Türkçe harfler korunur, diğer aksanlı harfler (é, à ...) temel harfe indirgenir
+    text = _strip_marks(unicodedata.normalize("NFKD", text.translate(_TURKISH_LETTERS)))
+    return text.translate(_LATIN_LETTERS)
+
+
+class SortedResults:
+    """Sonuç satırlarının alanlara göre sıralama permütasyonlarını bir kez hesaplar ve saklar.
+
+    Aynı sonuç kümesinde sıralama değiştirmek yalnızca hazır permütasyonu seçmektir.
+    Metin alanları turkish_sort_key ile, yalnızca farklı değerler sıralanarak karşılaştırılır.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._keys = {}
+        self._orders = {}
+
+    def _sort_keys(self, field):
+        keys = self._keys.get(field)
+        if keys is None:
+            values = [row[field] for row in self.rows]
+            if not all(isinstance(value, numbers.Real) for value in values):
+                # Farklı değerler sıralanır, her satır değerinin sırasını (rank) alır; aynı anahtara düşen
+                # değerler ("İpek", "ipek") küme sırasına (PYTHONHASHSEED) bırakılmaz, metne göre dizilir
+                ranks = {value: rank for rank, value in enumerate(
+                    sorted(set(values), key=lambda value: (turkish_sort_key(value), str(value))))}
+                values = [ranks[value] for value in values]
+            keys = self._keys[field] = np.asarray(values) if np is not None else values
+        return keys
+
+    def order(self, field, descending=False):
+        """Satır indekslerinin sıralı permütasyonu; eşit değerler sonuçtaki sıralarını korur."""
+        cached = self._orders.get((field, descending))
+        if cached is None:
+            keys = self._sort_keys(field)
+            if np is not None:
+                cached = np.argsort(-keys if descending else keys, kind="stable")
+            else:
+                cached = sorted(range(len(keys)), key=keys.__getitem__, reverse=descending)
+            self._orders[(field, descending)] = cached
+        return cached
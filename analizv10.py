@@ -1,11 +1,11 @@
 import json
 import os
-import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from collections import defaultdict
 from PIL import Image, ImageTk
 import customtkinter as ctk
+from arayuz_bilesenleri import BackgroundTask, CanvasTable
 
 # Varsayılan ayarları ve JSON yolu
 SETTINGS_FILE = "settings.json"
@@ -37,19 +37,22 @@ def apply_background(root, settings):
             print(f"Arka plan yüklenirken hata: {e}")
             root.configure(bg="black")
 
-def load_data_in_thread(directory_path, callback):
-    """Arka planda veri yükler."""
-    def task():
-        try:
-            data = []
-            for filename in os.listdir(directory_path):
-                if filename.endswith(".json"):
-                    with open(os.path.join(directory_path, filename), 'r', encoding='utf-8') as f:
-                        data.extend(json.load(f))
-            callback(data)
-        except Exception as e:
-            messagebox.showerror("Hata", f"Veriler yüklenemedi: {e}")
-    threading.Thread(target=task).start()
+def load_data_in_thread(root, directory_path, callback):
+    """Arka planda veri yükler; sonuç ve hata ana iş parçacığına kuyrukla iletilir."""
+    def task(report):
+        data = []
+        filenames = [filename for filename in os.listdir(directory_path) if filename.endswith(".json")]
+        for i, filename in enumerate(filenames):
+            with open(os.path.join(directory_path, filename), 'r', encoding='utf-8') as f:
+                data.extend(json.load(f))
+            report((i + 1) / len(filenames), filename)
+        # Analiz de iş parçacığında yapılır; ana iş parçacığına yalnızca sonuç gelir
+        return analyze_data(data)
+
+    def on_error(e):
+        messagebox.showerror("Hata", f"Veriler yüklenemedi: {e}")
+
+    BackgroundTask(root, task, callback, on_error).start()
 
 def analyze_data(data):
     """Dinlenen müzikleri analiz eder."""
@@ -62,9 +65,10 @@ def analyze_data(data):
     sorted_data = sorted(analyzed_data.items(), key=lambda x: x[1], reverse=True)
     return [{"track_name": k, "total_minutes": v} for k, v in sorted_data]
 
-def display_data(data):
+def display_data(parent, data):
     """Verileri ekranda görüntüler."""
-    root = ctk.CTk()
+    # İkinci bir ctk.CTk() kökü yerine ana pencereye bağlı bir pencere açılır
+    root = ctk.CTkToplevel(parent)
     root.title("Dinleme Analizleri")
     root.geometry("800x600")
     root.resizable(False, False)
@@ -94,30 +98,18 @@ def display_data(data):
 
     # Tablonun kendisi
     columns = ("Şarkı Adı", "Toplam Süre (dk)")
-    tree = ctk.CTkScrollableFrame(table_frame, width=760, height=500)
-    tree.pack(padx=10, pady=10)
+    tree = CanvasTable(table_frame, columns, width=760, height=500, header_font=("Arial", 10, "bold"))
+    tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-    for col in columns:
-        header_label = ctk.CTkLabel(tree, text=col, font=("Arial", 10, "bold"))
-        header_label.pack(pady=5)
-
-    # Satır ekleme
-    def populate_table():
-        for item in data:
-            row = f"{item['track_name']} - {item['total_minutes']} dk"
-            row_label = ctk.CTkLabel(tree, text=row, font=("Arial", 10))
-            row_label.pack(pady=5)
-
-    threading.Thread(target=populate_table).start()
-
-    root.mainloop()
+    # Satır başına etiket yerine görünen satırlar tuvale çizilir; ana iş parçacığında çağrılır
+    tree.set_rows(len(data), lambda i: (data[i]["track_name"], f"{data[i]['total_minutes']} dk"))
 
-def choose_directory_and_load():
+def choose_directory_and_load(root):
     """Klasör seçer ve verileri yükler."""
     directory = filedialog.askdirectory(title="JSON Dosyalarını Seç")
     if not directory:
         return
-    load_data_in_thread(directory, lambda data: display_data(analyze_data(data)))
+    load_data_in_thread(root, directory, lambda data: display_data(root, data))
 
 def main_interface():
     """Ana arayüz."""
@@ -131,7 +123,7 @@ def main_interface():
     title_label.pack(pady=20)
 
     # Klasör seç düğmesi
-    select_dir_btn = ctk.CTkButton(root, text="Klasör Seç", command=choose_directory_and_load)
+    select_dir_btn = ctk.CTkButton(root, text="Klasör Seç", command=lambda: choose_directory_and_load(root))
     select_dir_btn.pack(pady=10)
 
     root.mainloop()
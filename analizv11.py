@@ -5,6 +5,7 @@ from tkinter import filedialog, messagebox, ttk
 from collections import defaultdict
 from PIL import Image, ImageTk
 import customtkinter as ctk
+from arayuz_bilesenleri import TreeviewFeeder
 
 SETTINGS_FILE = "settings.json"
 DEFAULT_SETTINGS = {"background_type": "color", "background_value": "black"}
@@ -90,8 +91,9 @@ def display_data(data, root, settings):
     tree.configure(yscroll=scrollbar.set)
     scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-    for item in data:
-        tree.insert("", tk.END, values=(item["track_name"], item["artist_name"], item["album_name"], item["minutes_played"]))
+    # Satırlar tek döngüde değil, olay döngüsünü kilitlemeyen küçük gruplar halinde eklenir
+    TreeviewFeeder(tree, data, lambda item: tree.insert(
+        "", tk.END, values=(item["track_name"], item["artist_name"], item["album_name"], item["minutes_played"]))).start()
 
 
 # Klasör Seçme
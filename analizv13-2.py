@@ -1,14 +1,15 @@
 import json
 import os
 import tkinter as tk
-from tkinter import filedialog, ttk, messagebox, colorchooser
+from tkinter import filedialog, messagebox, colorchooser
 from collections import defaultdict
-from PIL import Image, ImageTk
 import customtkinter as ctk
+from arayuz_bilesenleri import ImageCache, VirtualTreeview, show_background_image
 
 SETTINGS_FILE = "settings.json"
 DEFAULT_SETTINGS = {"background_type": "color", "background_value": "black", "theme": "dark"}
 LOGO_PATH = "logo.png"
+IMAGE_CACHE = ImageCache()  # Arka plan ve logo görselleri, ölçeklenmiş kopyalarıyla
 
 # Geçerli renk isimleri
 VALID_COLOR_NAMES = {
@@ -47,17 +48,13 @@ def apply_theme_and_background(root, settings):
             )
             root.configure(bg="black")
     elif background_type == "image":
-        try:
-            img = Image.open(background_value)
-            img = img.resize((root.winfo_width(), root.winfo_height()), Image.ANTIALIAS)
-            photo = ImageTk.PhotoImage(img)
-            bg_label = tk.Label(root, image=photo)
-            bg_label.image = photo
-            bg_label.place(x=0, y=0, relwidth=1, relheight=1)
-        except Exception as e:
+        def on_error(e):
             messagebox.showerror("Hata", f"Arka plan yüklenirken hata oluştu: {e}")
             root.configure(bg="black")
 
+        # Görsel bir kez çözülür; her ekran geçişinde yeniden açılıp ölçeklenmez
+        show_background_image(root, background_value, IMAGE_CACHE, on_error)
+
     ctk.set_appearance_mode(settings.get("theme", "dark"))
 
 # Veri Yükleme ve Analiz
@@ -90,8 +87,7 @@ def display_data(data, root, settings):
     title_bar.pack(side="top", fill="x", padx=10, pady=10)
 
     if os.path.exists(LOGO_PATH):
-        logo_img = Image.open(LOGO_PATH).resize((40, 40), Image.ANTIALIAS)
-        logo_photo = ImageTk.PhotoImage(logo_img)
+        logo_photo = IMAGE_CACHE.photo(IMAGE_CACHE.scaled(LOGO_PATH, (40, 40)))
         logo_label = tk.Label(title_bar, image=logo_photo, bg="black")
         logo_label.image = logo_photo
         logo_label.pack(side="left", padx=10)
@@ -102,20 +98,13 @@ def display_data(data, root, settings):
     table_frame = ctk.CTkFrame(root, corner_radius=10)
     table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-    columns = ("Şarkı Adı", "Sanatçı", "Albüm", "Dinleme Süresi (dk)")
-    tree = ttk.Treeview(table_frame, columns=columns, show="headings")
-    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-    for col in columns:
-        tree.heading(col, text=col)
-        tree.column(col, anchor=tk.W)
-
-    scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=tree.yview)
-    tree.configure(yscroll=scrollbar.set)
-    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-    for item in data:
-        tree.insert("", tk.END, values=(item["track_name"], item["artist_name"], item["album_name"], item["minutes_played"]))
+    # Yalnızca görünen satırlar çizilir; başlığa tıklamak önbellekteki sıralamaya geçer
+    sort_fields = {"Şarkı Adı": "track_name", "Sanatçı": "artist_name", "Albüm": "album_name",
+                   "Dinleme Süresi (dk)": "minutes_played"}
+    tree = VirtualTreeview(table_frame, tuple(sort_fields))
+    tree.pack(fill=tk.BOTH, expand=True)
+    tree.set_sorted_rows(data, lambda item: (item["track_name"], item["artist_name"], item["album_name"],
+                                             item["minutes_played"]), sort_fields)
 
 
 # Klasör Seçme
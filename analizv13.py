@@ -3,12 +3,13 @@ import os
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from collections import defaultdict
-from PIL import Image, ImageTk
 import customtkinter as ctk
+from arayuz_bilesenleri import ImageCache, TreeviewFeeder, show_background_image
 
 SETTINGS_FILE = "settings.json"
 DEFAULT_SETTINGS = {"background_type": "color", "background_value": "black", "theme": "dark"}
 LOGO_PATH = "logo.png"  # Sol üst köşe için logo dosyası
+IMAGE_CACHE = ImageCache()  # Arka plan ve logo görselleri, ölçeklenmiş kopyalarıyla
 
 
 # Ayarlar Yükleme ve Kaydetme
@@ -32,17 +33,13 @@ def apply_theme_and_background(root, settings):
     if settings["background_type"] == "color":
         root.configure(bg=settings["background_value"])
     elif settings["background_type"] == "image":
-        try:
-            img = Image.open(settings["background_value"])
-            img = img.resize((root.winfo_width(), root.winfo_height()), Image.ANTIALIAS)
-            photo = ImageTk.PhotoImage(img)
-            bg_label = tk.Label(root, image=photo)
-            bg_label.image = photo
-            bg_label.place(x=0, y=0, relwidth=1, relheight=1)
-        except Exception as e:
+        def on_error(e):
             messagebox.showerror("Hata", f"Arka plan yüklenirken hata oluştu: {e}")
             root.configure(bg="black")
 
+        # Görsel bir kez çözülür; her ekran geçişinde yeniden açılıp ölçeklenmez
+        show_background_image(root, settings["background_value"], IMAGE_CACHE, on_error)
+
     ctk.set_appearance_mode(settings.get("theme", "dark"))
 
 
@@ -77,8 +74,7 @@ def display_data(data, root, settings):
 
     # Logo ekleme
     if os.path.exists(LOGO_PATH):
-        logo_img = Image.open(LOGO_PATH).resize((40, 40), Image.ANTIALIAS)
-        logo_photo = ImageTk.PhotoImage(logo_img)
+        logo_photo = IMAGE_CACHE.photo(IMAGE_CACHE.scaled(LOGO_PATH, (40, 40)))
         logo_label = tk.Label(title_bar, image=logo_photo, bg="black")
         logo_label.image = logo_photo
         logo_label.pack(side="left", padx=10)
@@ -101,8 +97,9 @@ def display_data(data, root, settings):
     tree.configure(yscroll=scrollbar.set)
     scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-    for item in data:
-        tree.insert("", tk.END, values=(item["track_name"], item["artist_name"], item["album_name"], item["minutes_played"]))
+    # Satırlar tek döngüde değil, olay döngüsünü kilitlemeyen küçük gruplar halinde eklenir
+    TreeviewFeeder(tree, data, lambda item: tree.insert(
+        "", tk.END, values=(item["track_name"], item["artist_name"], item["album_name"], item["minutes_played"]))).start()
 
 
 # Klasör Seçme
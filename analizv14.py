@@ -1,14 +1,21 @@
 import json
 import os
+from datetime import datetime, timedelta
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
-from collections import defaultdict
-from PIL import Image, ImageTk
 import customtkinter as ctk
+from arayuz_bilesenleri import (BackgroundTask, ImageCache, TreeviewFeeder, VirtualTreeview,
+                                show_background_image)
+from analiz_motoru import (MIN_SEARCH_LENGTH, FilterError, analyze_behaviour, analyze_by_uri, analyze_sessions,
+                           bucket_of, bucket_start, filter_table, open_history, rollup_hierarchy, search_mask,
+                           time_cube)
 
 SETTINGS_FILE = "settings.json"
-DEFAULT_SETTINGS = {"background_type": "color", "background_value": "black", "theme": "dark"}
+DEFAULT_SETTINGS = {"background_type": "color", "background_value": "black", "theme": "dark", "ingest_workers": 0, "top_k": 100,
+                    "session_gap_minutes": 30}
 LOGO_PATH = "logo.png"  # Sol üst köşe için logo dosyası
+IMAGE_CACHE = ImageCache()  # Arka plan ve logo görselleri, ölçeklenmiş kopyalarıyla
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(SETTINGS_FILE)), "veri_onbellegi")
 
 
 # Ayarlar Yükleme ve Kaydetme
@@ -32,44 +39,52 @@ def apply_theme_and_background(root, settings):
     if settings["background_type"] == "color":
         root.configure(bg=settings["background_value"])
     elif settings["background_type"] == "image":
-        try:
-            img = Image.open(settings["background_value"])
-            img = img.resize((root.winfo_width(), root.winfo_height()), Image.ANTIALIAS)
-            photo = ImageTk.PhotoImage(img)
-            bg_label = tk.Label(root, image=photo)
-            bg_label.image = photo
-            bg_label.place(x=0, y=0, relwidth=1, relheight=1)
-        except Exception as e:
+        def on_error(e):
             messagebox.showerror("Hata", f"Arka plan yüklenirken hata oluştu: {e}")
             root.configure(bg="black")
 
+        # Görsel bir kez çözülür; her ekran geçişinde yeniden açılıp ölçeklenmez
+        show_background_image(root, settings["background_value"], IMAGE_CACHE, on_error)
+
     ctk.set_appearance_mode(settings.get("theme", "dark"))
 
 
-# Veri Yükleme ve Analiz
-def read_json(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+# Kaydırma Çubuklu Tablo
+def build_tree(parent, columns, rows, row_values, sort_fields):
+    # Yalnızca görünen satırlar Treeview'e yazılır; değerler row_values ile kaydırıldıkça üretilir.
+    # sort_fields başlığa tıklanınca sıralanacak satır alanlarıdır ({sütun: alan}).
+    tree = VirtualTreeview(parent, columns)
+    tree.pack(fill=tk.BOTH, expand=True)
+    tree.set_sorted_rows(rows, row_values, sort_fields)
+    return tree
+
 
+# Arka Plan Analizi
+def run_task(root, work, on_done, controls=(), owner=None):
+    # Büyük geçmişlerde analiz saniyeler sürer; pencere donmasın diye ayrı iş parçacığında yapılır.
+    # controls iş bitene kadar devre dışı kalır; owner yok edilirse (ekran değiştiyse) sonuç yok sayılır.
+    for control in controls:
+        control.configure(state="disabled")
 
-def analyze_data(data):
-    analyzed_data = defaultdict(lambda: {"minutes_played": 0, "artist_name": "", "album_name": ""})
-    for entry in data:
-        track_name = entry.get("master_metadata_track_name", "Unknown")
-        artist_name = entry.get("master_metadata_album_artist_name", "Unknown")
-        album_name = entry.get("master_metadata_album_album_name", "Unknown")
-        minutes_played = entry.get("ms_played", 0) // 60000
+    def release():
+        for control in controls:
+            if control.winfo_exists():
+                control.configure(state="normal")
 
-        analyzed_data[track_name]["minutes_played"] += minutes_played
-        analyzed_data[track_name]["artist_name"] = artist_name
-        analyzed_data[track_name]["album_name"] = album_name
+    def on_finish(result):
+        release()
+        on_done(result)
 
-    sorted_data = sorted(analyzed_data.items(), key=lambda x: x[1]["minutes_played"], reverse=True)
-    return [{"track_name": k, **v} for k, v in sorted_data]
+    def on_error(error):
+        release()
+        messagebox.showerror("Hata", f"Analiz yapılamadı: {error}")
+
+    return BackgroundTask(root, lambda report: work(), on_finish, on_error, owner=owner).start()
 
 
 # Verileri Tabloya Gösterme
-def display_data(data, root, settings):
+def display_data(data, root, settings, status_text="", date_range=("", ""), on_date_range=None, on_sessions=None,
+                 on_behaviour=None, on_hierarchy=None, on_search=None, on_time=None):
     apply_theme_and_background(root, settings)
 
     title_bar = ctk.CTkFrame(root, height=50, corner_radius=10)
@@ -77,54 +92,368 @@ def display_data(data, root, settings):
 
     # Logo ekleme
     if os.path.exists(LOGO_PATH):
-        logo_img = Image.open(LOGO_PATH).resize((40, 40), Image.ANTIALIAS)
-        logo_photo = ImageTk.PhotoImage(logo_img)
+        logo_photo = IMAGE_CACHE.photo(IMAGE_CACHE.scaled(LOGO_PATH, (40, 40)))
         logo_label = tk.Label(title_bar, image=logo_photo, bg="black")
         logo_label.image = logo_photo
         logo_label.pack(side="left", padx=10)
 
     title_label = ctk.CTkLabel(title_bar, text="Dinleme Verisi Analizörü", font=("Arial", 18, "bold"))
     title_label.pack(side="left", pady=5)
+    # Bir analiz sürerken devre dışı bırakılacak düğmeler
+    buttons = []
+
+    if status_text:
+        status_label = ctk.CTkLabel(title_bar, text=status_text, font=("Arial", 12))
+        status_label.pack(side="right", padx=10)
+
+    if on_time:
+        time_button = ctk.CTkButton(title_bar, text="Zaman", width=90, command=on_time)
+        time_button.pack(side="right", padx=5)
+        buttons.append(time_button)
+
+    if on_hierarchy:
+        hierarchy_button = ctk.CTkButton(title_bar, text="Sanatçılar", width=90, command=on_hierarchy)
+        hierarchy_button.pack(side="right", padx=5)
+        buttons.append(hierarchy_button)
+
+    if on_behaviour:
+        behaviour_button = ctk.CTkButton(title_bar, text="Atlamalar", width=90, command=on_behaviour)
+        behaviour_button.pack(side="right", padx=5)
+        buttons.append(behaviour_button)
+
+    if on_sessions:
+        sessions_button = ctk.CTkButton(title_bar, text="Oturumlar", width=90, command=on_sessions)
+        sessions_button.pack(side="right", padx=5)
+        buttons.append(sessions_button)
+
+    if on_date_range:
+        range_button = ctk.CTkButton(title_bar, text="Uygula", width=70,
+                                     command=lambda: on_date_range(start_entry.get(), end_entry.get()))
+        range_button.pack(side="right", padx=5)
+        buttons.append(range_button)
+
+        end_entry = ctk.CTkEntry(title_bar, width=110, placeholder_text="Bitiş (YYYY-AA-GG)")
+        if date_range[1]:
+            end_entry.insert(0, date_range[1])
+        end_entry.pack(side="right", padx=5)
+
+        start_entry = ctk.CTkEntry(title_bar, width=110, placeholder_text="Başlangıç (YYYY-AA-GG)")
+        if date_range[0]:
+            start_entry.insert(0, date_range[0])
+        start_entry.pack(side="right", padx=5)
 
     table_frame = ctk.CTkFrame(root, corner_radius=10)
     table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-    columns = ("Şarkı Adı", "Sanatçı", "Albüm", "Dinleme Süresi (dk)")
-    tree = ttk.Treeview(table_frame, columns=columns, show="headings")
-    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    if on_search:
+        search_entry = ctk.CTkEntry(table_frame, placeholder_text="Şarkı, sanatçı veya albüm ara")
+        search_entry.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
 
-    for col in columns:
-        tree.heading(col, text=col)
-        tree.column(col, anchor=tk.W)
+    def row_values(item):
+        return item["track_name"], item["artist_name"], item["album_name"], item["minutes_played"]
 
-    scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=tree.yview)
-    tree.configure(yscroll=scrollbar.set)
-    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    sort_fields = {"Şarkı Adı": "track_name", "Sanatçı": "artist_name", "Albüm": "album_name",
+                   "Dinleme Süresi (dk)": "minutes_played"}
+    tree = build_tree(table_frame, tuple(sort_fields), data, row_values, sort_fields)
+
+    def fill(rows):
+        tree.set_sorted_rows(rows, row_values, sort_fields)
+
+    if on_search:
+        # Her tuşta değil, yazma 200 ms durduğunda aranır; sonucu gelmemiş önceki arama iptal edilir
+        pending = [None]
+        running = [None]
 
-    for item in data:
-        tree.insert("", tk.END, values=(item["track_name"], item["artist_name"], item["album_name"], item["minutes_played"]))
+        def run_search():
+            pending[0] = None
+            if running[0] is not None:
+                running[0].cancel()
+            running[0] = on_search(search_entry.get(), fill, tree)
 
+        def schedule_search(event):
+            if pending[0] is not None:
+                root.after_cancel(pending[0])
+            pending[0] = root.after(200, run_search)
 
-# Klasör Seçme
-def choose_directory(root, settings):
+        search_entry.bind("<KeyRelease>", schedule_search)
+
+    return buttons
+
+
+# Klasör veya ZIP Seçme
+def choose_directory(root, settings, filter_text="", controls=()):
     directory_path = filedialog.askdirectory(title="JSON Dosyalarının Bulunduğu Klasörü Seçin")
-    if not directory_path:
+    if directory_path:
+        load_and_display(directory_path, root, settings, filter_text, controls)
+
+
+def choose_zip(root, settings, filter_text="", controls=()):
+    zip_path = filedialog.askopenfilename(title="Spotify ZIP Arşivini Seçin", filetypes=[("ZIP Arşivi", "*.zip")])
+    if zip_path:
+        load_and_display(zip_path, root, settings, filter_text, controls)
+
+
+def load_and_display(source_path, root, settings, filter_text="", controls=()):
+    # Okuma ve ilk analiz ayrı iş parçacığında yapılır; pencere bu sırada yanıt vermeye devam eder.
+    # Kaynak ve ayar düğmeleri yükleme bitene kadar kapalıdır: ikinci bir yükleme aynı arşive yazar,
+    # ayarlar ekranı ise ilerleme çubuğunu yok eder.
+    for control in controls:
+        control.configure(state="disabled")
+    progress_frame = ctk.CTkFrame(root, corner_radius=10)
+    progress_frame.pack(fill="x", padx=10, pady=10)
+    progress_label = ctk.CTkLabel(progress_frame, text="Veriler yükleniyor...", font=("Arial", 12))
+    progress_label.pack(pady=5)
+    progress_bar = ctk.CTkProgressBar(progress_frame)
+    progress_bar.set(0)
+    progress_bar.pack(fill="x", padx=10, pady=5)
+
+    def work(report):
+        # Kaynak daha önce açıldıysa geçmiş, diskteki arşivden mmap ile hiçbir şey çözülmeden açılır
+        table = open_history(source_path, CACHE_DIR, workers=settings.get("ingest_workers", 0), progress=report)
+        if filter_text.strip():
+            # Filtre bir kez derlenir ve analizden önce tüm tabloya sütun bazlı uygulanır
+            report(1.0, "Filtre uygulanıyor")
+            table = filter_table(table, filter_text)
+        report(1.0, "Analiz ediliyor")
+        analyzed_data = analyze_by_uri(table, settings.get("top_k", 100) or None)
+        # Zaman görünümündeki sorgular dinlemeleri taramadan küp hücrelerinden yanıtlanır
+        report(1.0, "Zaman küpü oluşturuluyor")
+        return table, analyzed_data, time_cube(table)
+
+    def on_progress(fraction, text):
+        progress_bar.set(fraction)
+        progress_label.configure(text=text)
+
+    def on_done(result):
+        progress_frame.destroy()
+        table, analyzed_data, cube = result
+        if len(table):
+            show_history(table, root, settings, analyzed_data=analyzed_data, cube=cube)
+        else:
+            messagebox.showerror("Hata", "Hiçbir veri bulunamadı.")
+
+    def on_error(error):
+        progress_frame.destroy()
+        for control in controls:
+            if control.winfo_exists():
+                control.configure(state="normal")
+        if isinstance(error, FilterError):
+            messagebox.showerror("Hata", f"Filtre hatalı: {error}")
+        else:
+            messagebox.showerror("Hata", f"Veriler yüklenemedi: {error}")
+
+    BackgroundTask(root, work, on_done, on_error, on_progress, owner=progress_frame).start()
+
+
+def parse_date(text):
+    return datetime.strptime(text.strip(), "%Y-%m-%d") if text.strip() else None
+
+
+def show_history(table, root, settings, start_text="", end_text="", analyzed_data=None, cube=None, controls=()):
+    try:
+        start = parse_date(start_text)
+        end = parse_date(end_text)
+    except ValueError:
+        messagebox.showerror("Hata", "Tarihler YYYY-AA-GG biçiminde girilmelidir.")
+        return
+    # Bitiş günü dahildir; satırlar zamana göre sıralı olduğundan aralık kopyalanmadan dilimlenir
+    window = table.slice_range(start, end + timedelta(days=1) if end else None)
+
+    # Aynı adlı farklı şarkılar karışmasın diye toplama Spotify URI'sine göre yapılır;
+    # tüm şarkılar sıralanmaz, yalnızca gösterilecek ilk K şarkı seçilir (0 = tümü)
+    top_k = settings.get("top_k", 100) or None
+    if analyzed_data is None:
+        # Ekran sonuç gelince yeniden kurulur; o zamana kadar mevcut ekranın düğmeleri kapalıdır
+        run_task(root, lambda: analyze_by_uri(window, top_k),
+                 lambda analyzed_data: show_history(table, root, settings, start_text, end_text, analyzed_data, cube),
+                 controls, controls[0] if controls else None)
         return
+    status_text = f"{len(window)} dinleme"
+    if table.duplicates_dropped:
+        status_text += f" ({table.duplicates_dropped} tekrarlı dinleme çıkarıldı)"
+    buttons = []
+
+    def search(query, fill, owner):
+        # Ad dizini arşivden açıldığı için arama, eşleşen kodlardan bir maske oluşturmakla sınırlıdır
+        if len(query.strip()) < MIN_SEARCH_LENGTH:
+            fill(analyzed_data)
+            return None
+        return run_task(root, lambda: analyze_by_uri(window.take(search_mask(window, query)), top_k), fill,
+                        owner=owner)
+
+    buttons.extend(display_data(
+        analyzed_data, root, settings, status_text, (start_text, end_text),
+        lambda start_text, end_text: show_history(table, root, settings, start_text, end_text, cube=cube,
+                                                  controls=buttons),
+        lambda: show_sessions(window, root, settings, buttons), lambda: show_behaviour(window, root, settings, buttons),
+        lambda: show_hierarchy(window, root, buttons), search,
+        (lambda: show_time(cube, root, settings)) if cube else None))
+
+
+# Dinleme Oturumları Penceresi
+def show_sessions(table, root, settings, controls=()):
+    # Aradaki boşluk ayarlanan süreyi aşınca yeni oturum başlar; yalnızca en uzun oturumlar listelenir
+    gap_ms = settings.get("session_gap_minutes", 30) * 60000
+    run_task(root, lambda: analyze_sessions(table, gap_ms, settings.get("top_k", 100) or None),
+             lambda sessions: sessions_window(sessions, root), controls)
+
+
+def sessions_window(sessions, root):
+    window = ctk.CTkToplevel(root)
+    window.title("Dinleme Oturumları")
+    window.geometry("800x400")
+
+    build_tree(window, ("Başlangıç", "Bitiş", "Süre (dk)", "Şarkı Sayısı", "Baskın Sanatçı"), sessions,
+               lambda session: (session["start"].strftime("%Y-%m-%d %H:%M"), session["end"].strftime("%Y-%m-%d %H:%M"),
+                                session["minutes"], session["track_count"], session["artist_name"]),
+               {"Başlangıç": "start", "Bitiş": "end", "Süre (dk)": "minutes", "Şarkı Sayısı": "track_count",
+                "Baskın Sanatçı": "artist_name"})
+
+
+# Sanatçı → Albüm → Şarkı Penceresi
+def show_hierarchy(table, root, controls=()):
+    run_task(root, lambda: rollup_hierarchy(table), lambda rollup: hierarchy_window(table, rollup, root), controls)
+
+
+def hierarchy_window(table, rollup, root):
+    window = ctk.CTkToplevel(root)
+    window.title("Sanatçılar, Albümler ve Şarkılar")
+    window.geometry("800x500")
+
+    tree = ttk.Treeview(window, columns=("Dinleme", "Dinleme Süresi (dk)"), show="tree headings")
+    tree.heading("#0", text="Sanatçı / Albüm / Şarkı")
+    tree.heading("Dinleme", text="Dinleme")
+    tree.heading("Dinleme Süresi (dk)", text="Dinleme Süresi (dk)")
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-    all_data = []
-    for file_name in os.listdir(directory_path):
-        if file_name.endswith(".json"):
-            try:
-                file_path = os.path.join(directory_path, file_name)
-                all_data.extend(read_json(file_path))
-            except Exception as e:
-                print(f"Dosya okunurken hata oluştu: {file_name}. Hata: {e}")
+    scrollbar = ttk.Scrollbar(window, orient=tk.VERTICAL, command=tree.yview)
+    tree.configure(yscroll=scrollbar.set)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-    if all_data:
-        analyzed_data = analyze_data(all_data)
-        display_data(analyzed_data, root, settings)
-    else:
-        messagebox.showerror("Hata", "Hiçbir veri bulunamadı.")
+    # Çocuklar yalnızca düğüm açılınca, önceden hesaplanmış dilimden eklenir; boş çocuk açma okunu gösterir
+    def insert_node(parent, iid, name, plays, minutes, expandable):
+        tree.insert(parent, tk.END, iid=iid, text=name, values=(plays, minutes))
+        if expandable:
+            tree.insert(iid, tk.END, iid=iid + "/")
+
+    def on_open(event):
+        iid = tree.focus()
+        if not tree.exists(iid + "/"):
+            return
+        tree.delete(iid + "/")
+        level, position = iid.split(":")
+        if level == "a":
+            for album in rollup.albums_of(int(position)):
+                insert_node(iid, f"b:{album}", table.decode("album", rollup.album_codes[album]),
+                            rollup.album_plays[album], rollup.album_minutes[album], True)
+        else:
+            for track in rollup.tracks_of(int(position)):
+                insert_node(iid, f"t:{track}", table.decode("track", rollup.track_codes[track]),
+                            rollup.track_plays[track], rollup.track_minutes[track], False)
+
+    tree.bind("<<TreeviewOpen>>", on_open)
+    # Sanatçılar pencere açılır açılmaz görünür, kalanlar küçük gruplar halinde eklenir
+    TreeviewFeeder(tree, range(len(rollup.artist_codes)), lambda artist: insert_node(
+        "", f"a:{artist}", table.decode("artist", rollup.artist_codes[artist]),
+        rollup.artist_plays[artist], rollup.artist_minutes[artist], True)).start()
+
+
+# Yıl → Ay → Sanatçı ve Günün Saatleri Penceresi
+def show_time(cube, root, settings):
+    # Tüm geçmişi kapsar; dilimler yerel saate göredir
+    top_k = settings.get("top_k", 100) or None
+
+    window = ctk.CTkToplevel(root)
+    window.title("Zaman Dağılımı")
+    window.geometry("800x500")
+
+    notebook = ttk.Notebook(window)
+    notebook.pack(fill=tk.BOTH, expand=True)
+
+    month_frame = ttk.Frame(notebook)
+    notebook.add(month_frame, text="Yıllar ve Aylar")
+    tree = ttk.Treeview(month_frame, columns=("Dinleme Süresi (dk)",), show="tree headings")
+    tree.heading("#0", text="Yıl / Ay / Sanatçı")
+    tree.heading("Dinleme Süresi (dk)", text="Dinleme Süresi (dk)")
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    scrollbar = ttk.Scrollbar(month_frame, orient=tk.VERTICAL, command=tree.yview)
+    tree.configure(yscroll=scrollbar.set)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def insert_node(parent, iid, name, ms, expandable):
+        tree.insert(parent, tk.END, iid=iid, text=name, values=(ms // 60000,))
+        if expandable:
+            tree.insert(iid, tk.END, iid=iid + "/")
+
+    # Aylar ve sanatçılar yalnızca düğüm açılınca küpten toplanır
+    def on_open(event):
+        iid = tree.focus()
+        if not tree.exists(iid + "/"):
+            return
+        tree.delete(iid + "/")
+        grain, bucket = iid.split(":")
+        start = bucket_start(grain, int(bucket))
+        if grain == "year":
+            for month_start, ms in cube.series("month", start, bucket_start("year", int(bucket) + 1)):
+                insert_node(iid, f"month:{bucket_of('month', month_start)}", month_start.strftime("%Y-%m"), ms, True)
+        else:
+            for item in cube.top("month", "artist", top_k, start, bucket_start("month", int(bucket) + 1)):
+                tree.insert(iid, tk.END, text=item["artist_name"], values=(item["minutes_played"],))
+
+    tree.bind("<<TreeviewOpen>>", on_open)
+    for year_start, ms in cube.series("year"):
+        insert_node("", f"year:{bucket_of('year', year_start)}", str(year_start.year), ms, True)
+
+    hour_frame = ttk.Frame(notebook)
+    notebook.add(hour_frame, text="Günün Saatleri")
+    hours = [{"hour": hour, "minutes_played": ms // 60000} for hour, ms in enumerate(cube.hour_of_day())]
+    build_tree(hour_frame, ("Saat", "Dinleme Süresi (dk)"), hours,
+               lambda item: (f"{item['hour']:02d}:00", item["minutes_played"]),
+               {"Saat": "hour", "Dinleme Süresi (dk)": "minutes_played"})
+
+
+# Atlama ve Bitiş Nedeni Penceresi
+def show_behaviour(table, root, settings, controls=()):
+    # Oranlar birkaç dinlemede yanıltıcı olacağı için en az 5 kez dinlenenler listelenir
+    run_task(root, lambda: analyze_behaviour(table, settings.get("top_k", 100) or None, min_plays=5),
+             lambda behaviour: behaviour_window(behaviour, root), controls)
+
+
+def behaviour_window(behaviour, root):
+    window = ctk.CTkToplevel(root)
+    window.title("Atlamalar ve Bitiş Nedenleri")
+    window.geometry("800x450")
+
+    total_ms = behaviour["shuffle_ms"] + behaviour["ordered_ms"]
+    shuffle_share = behaviour["shuffle_ms"] / total_ms * 100 if total_ms else 0
+    summary = ctk.CTkLabel(window, font=("Arial", 12),
+                           text=f"Karışık: {behaviour['shuffle_ms'] // 60000} dk (%{shuffle_share:.0f})  |  "
+                                f"Sıralı: {behaviour['ordered_ms'] // 60000} dk")
+    summary.pack(pady=5)
+
+    notebook = ttk.Notebook(window)
+    notebook.pack(fill=tk.BOTH, expand=True)
+
+    track_frame = ttk.Frame(notebook)
+    notebook.add(track_frame, text="Şarkılar")
+    build_tree(track_frame, ("Şarkı Adı", "Sanatçı", "Dinleme", "Atlama", "Atlama Oranı"), behaviour["tracks"],
+               lambda item: (item["track_name"], item["artist_name"], item["plays"], item["skips"],
+                             f"%{item['skip_rate'] * 100:.0f}"),
+               {"Şarkı Adı": "track_name", "Sanatçı": "artist_name", "Dinleme": "plays", "Atlama": "skips",
+                "Atlama Oranı": "skip_rate"})
+
+    artist_frame = ttk.Frame(notebook)
+    notebook.add(artist_frame, text="Sanatçılar")
+    build_tree(artist_frame, ("Sanatçı", "Dinleme", "Atlama", "Atlama Oranı"), behaviour["artists"],
+               lambda item: (item["artist_name"], item["plays"], item["skips"], f"%{item['skip_rate'] * 100:.0f}"),
+               {"Sanatçı": "artist_name", "Dinleme": "plays", "Atlama": "skips", "Atlama Oranı": "skip_rate"})
+
+    reason_frame = ttk.Frame(notebook)
+    notebook.add(reason_frame, text="Bitiş Nedenleri")
+    build_tree(reason_frame, ("Neden", "Dinleme", "Dinleme Süresi (dk)"), behaviour["reason_end"],
+               lambda item: (item["reason"], item["plays"], item["minutes_played"]),
+               {"Neden": "reason", "Dinleme": "plays", "Dinleme Süresi (dk)": "minutes_played"})
 
 
 # Ayarlar Arayüzü
@@ -136,8 +465,12 @@ def settings_menu(root):
         bg_value = bg_entry.get()
         bg_type = "image" if bg_value.endswith((".png", ".jpg", ".jpeg")) else "color"
         theme_value = theme_var.get()
+        workers_value = int(workers_entry.get()) if workers_entry.get().isdigit() else 0
+        top_k_value = int(top_k_entry.get()) if top_k_entry.get().isdigit() else 100
+        gap_value = int(gap_entry.get()) if gap_entry.get().isdigit() else 30
 
-        settings.update({"background_type": bg_type, "background_value": bg_value, "theme": theme_value})
+        settings.update({"background_type": bg_type, "background_value": bg_value, "theme": theme_value,
+                         "ingest_workers": workers_value, "top_k": top_k_value, "session_gap_minutes": gap_value})
         save_settings(settings)
         apply_theme_and_background(root, settings)
 
@@ -170,6 +503,27 @@ def settings_menu(root):
     theme_light = ctk.CTkRadioButton(settings_frame, text="Açık Tema", variable=theme_var, value="light")
     theme_light.pack(pady=5)
 
+    workers_label = ctk.CTkLabel(settings_frame, text="Paralel Okuma İşçi Sayısı (0 = otomatik)", font=("Arial", 12))
+    workers_label.pack(pady=5)
+
+    workers_entry = ctk.CTkEntry(settings_frame)
+    workers_entry.insert(0, str(settings.get("ingest_workers", 0)))
+    workers_entry.pack(pady=5)
+
+    top_k_label = ctk.CTkLabel(settings_frame, text="Listelenecek Şarkı Sayısı (0 = tümü)", font=("Arial", 12))
+    top_k_label.pack(pady=5)
+
+    top_k_entry = ctk.CTkEntry(settings_frame)
+    top_k_entry.insert(0, str(settings.get("top_k", 100)))
+    top_k_entry.pack(pady=5)
+
+    gap_label = ctk.CTkLabel(settings_frame, text="Oturum Arası Boşluk (dk)", font=("Arial", 12))
+    gap_label.pack(pady=5)
+
+    gap_entry = ctk.CTkEntry(settings_frame)
+    gap_entry.insert(0, str(settings.get("session_gap_minutes", 30)))
+    gap_entry.pack(pady=5)
+
     save_button = ctk.CTkButton(settings_frame, text="Kaydet", command=update_settings)
     save_button.pack(pady=10)
 
@@ -184,12 +538,26 @@ def main_interface():
     settings = load_settings()
     apply_theme_and_background(root, settings)
 
-    select_dir_btn = ctk.CTkButton(root, text="Klasör Seç ve Verileri Göster", command=lambda: choose_directory(root, settings))
-    select_dir_btn.pack(pady=20)
+    source_frame = ctk.CTkFrame(root, fg_color="transparent")
+    source_frame.pack(pady=20)
+
+    # Yükleme sürerken kapatılacak düğmeler; aşağıda oluşturulunca eklenir
+    controls = []
+    select_dir_btn = ctk.CTkButton(source_frame, text="Klasör Seç ve Verileri Göster",
+                                   command=lambda: choose_directory(root, settings, filter_entry.get(), controls))
+    select_dir_btn.pack(side="left", padx=5)
+
+    filter_entry = ctk.CTkEntry(source_frame, width=380,
+                                placeholder_text='Filtre, ör: artist = "Little Mix" and year >= 2022 and not skipped')
+    filter_entry.pack(side="left", padx=5)
+
+    select_zip_btn = ctk.CTkButton(root, text="ZIP Seç ve Verileri Göster",
+                                   command=lambda: choose_zip(root, settings, filter_entry.get(), controls))
+    select_zip_btn.pack(pady=10)
 
-    settings_btn = ctk.CTk
-    Button(root, text="Ayarlar", command=lambda: settings_menu(root))
+    settings_btn = ctk.CTkButton(root, text="Ayarlar", command=lambda: settings_menu(root))
     settings_btn.pack(pady=10)
+    controls.extend([select_dir_btn, select_zip_btn, settings_btn])
 
     root.mainloop()
 
@@ -3,6 +3,7 @@ import os
 import tkinter as tk
 from tkinter import filedialog, ttk
 from collections import Counter
+from analiz_motoru import iter_zip_records
 
 # JSON dosyasını okuyun
 def read_json(file_path):
@@ -73,6 +74,9 @@ def read_all_json_in_directory(directory_path):
                 all_data.extend(data)
             except Exception as e:
                 print(f"Dosya okunurken hata oluştu: {file_name}. Hata: {e}")
+        elif file_name.endswith(".zip"):
+            # ZIP arşivi diske çıkarılmadan okunur
+            all_data.extend(iter_zip_records(os.path.join(directory_path, file_name)))
 
     return all_data
 
@@ -90,10 +94,10 @@ def choose_directory():
         display_data(analyzed_data, most_played_artist)
 
 def choose_file():
-    file_path = filedialog.askopenfilename(title="Bir JSON dosyası seçin", filetypes=[("JSON Files", "*.json")])
+    file_path = filedialog.askopenfilename(title="Bir JSON veya ZIP dosyası seçin", filetypes=[("JSON or ZIP Files", "*.json *.zip")])
     if file_path:
         try:
-            data = read_json(file_path)
+            data = iter_zip_records(file_path) if file_path.endswith(".zip") else read_json(file_path)
             analyzed_data, most_played_artist = analyze_data(data)
             display_data(analyzed_data, most_played_artist)
         except Exception as e:
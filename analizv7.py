@@ -4,6 +4,7 @@ import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from collections import defaultdict
 from PIL import Image, ImageTk
+from analiz_motoru import iter_zip_records
 
 def read_json(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
@@ -98,6 +99,9 @@ def read_all_json_in_directory(directory_path):
                 all_data.extend(data)
             except Exception as e:
                 print(f"Dosya okunurken hata oluştu: {file_name}. Hata: {e}")
+        elif file_name.endswith(".zip"):
+            # ZIP arşivi diske çıkarılmadan okunur
+            all_data.extend(iter_zip_records(os.path.join(directory_path, file_name)))
 
     return all_data
 
@@ -114,10 +118,10 @@ def choose_directory():
         display_data(analyzed_data)
 
 def choose_file():
-    file_path = filedialog.askopenfilename(title="Bir JSON dosyası seçin", filetypes=[("JSON Files", "*.json")])
+    file_path = filedialog.askopenfilename(title="Bir JSON veya ZIP dosyası seçin", filetypes=[("JSON or ZIP Files", "*.json *.zip")])
     if file_path:
         try:
-            data = read_json(file_path)
+            data = iter_zip_records(file_path) if file_path.endswith(".zip") else read_json(file_path)
             analyzed_data = analyze_data(data)
             display_data(analyzed_data)
         except Exception as e:
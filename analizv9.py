@@ -5,6 +5,7 @@ from tkinter import filedialog, messagebox
 from collections import defaultdict
 from PIL import Image, ImageTk
 import customtkinter as ctk
+from arayuz_bilesenleri import CanvasTable
 
 # CustomTkinter temasını ayarlama
 ctk.set_appearance_mode("dark")  # "dark" veya "light"
@@ -133,23 +134,10 @@ def display_data(analyzed_data):
     frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
     columns = ("Şarkı Adı", "Sanatçı", "Albüm", "Toplam Dinleme Süresi (dk)")
-    tree = ctk.CTkScrollableFrame(frame, width=950, height=450)
+    # Satırlar tek tuvale çizilir; yalnızca görünen satırlar kadar tuval öğesi vardır
+    tree = CanvasTable(frame, columns, width=950, height=450)
     tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-    header_frame = ctk.CTkFrame(tree)
-    header_frame.pack(fill=tk.X, pady=(0, 10))
-
-    for col in columns:
-        header = ctk.CTkLabel(header_frame, text=col, font=("Arial", 12, "bold"))
-        header.pack(side="left", padx=50)
-
-    for item in analyzed_data:
-        row_frame = ctk.CTkFrame(tree)
-        row_frame.pack(fill=tk.X, pady=5)
-
-        ctk.CTkLabel(row_frame, text=item["track_name"], font=("Arial", 10)).pack(side="left", padx=50)
-        ctk.CTkLabel(row_frame, text=item["artist"], font=("Arial", 10)).pack(side="left", padx=50)
-        ctk.CTkLabel(row_frame, text=item["album"], font=("Arial", 10)).pack(side="left", padx=50)
-        ctk.CTkLabel(row_frame, text=str(item["total_minutes"]), font=("Arial", 10)).pack(side="left", padx=50)
+    tree.set_rows(len(analyzed_data), lambda i: (analyzed_data[i]["track_name"], analyzed_data[i]["artist"],
+                                                 analyzed_data[i]["album"], analyzed_data[i]["total_minutes"]))
 
     root.mainloop()
@@ -0,0 +1,573 @@
+import queue
+import threading
+import time
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import font as tkfont
+from tkinter import ttk
+
+import customtkinter as ctk
+from PIL import Image, ImageTk
+
+from analiz_motoru import SortedResults
+
+
+# Sanal Tablo
+class VirtualTreeview(ttk.Frame):
+    """Yalnızca pencereye sığan satır kadar Treeview öğesi tutan tablo.
+
+    Satır değerleri row_at(i) ile gerektiğinde istenir; kaydırıldığında yeni öğe eklenmez,
+    mevcut öğelerin değerleri değiştirilir. Böylece açılış süresi ve bellek satır sayısından
+    bağımsızdır.
+    """
+
+    def __init__(self, parent, columns, wheel_rows=3):
+        super().__init__(parent)
+        self.columns = columns
+        self.wheel_rows = wheel_rows
+        self.count = 0
+        self.row_at = None
+        self.first = 0
+        self.items = []
+        self.selected_row = None
+        self.sort_column = None
+        self.descending = False
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=1, selectmode="browse")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, anchor=tk.W)
+
+        # Kaydırma çubuğu Treeview'e değil, satır penceresine bağlıdır
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", lambda event: self._render())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_rows(-self.wheel_rows))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_rows(self.wheel_rows))
+        self.tree.bind("<Up>", lambda event: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self.scroll_rows(-self._visible_rows()))
+        self.tree.bind("<Next>", lambda event: self.scroll_rows(self._visible_rows()))
+        self.tree.bind("<Home>", lambda event: self.scroll_to(0))
+        self.tree.bind("<End>", lambda event: self.scroll_to(self.count))
+
+    def set_rows(self, count, row_at):
+        """count satırlık yeni sonucu gösterir; row_at(i) i. satırın değer demetini döndürür."""
+        self.count = count
+        self.row_at = row_at
+        self.first = 0
+        self.selected_row = None
+        self._render()
+
+    def set_sorted_rows(self, rows, row_values, sort_fields):
+        """rows listesini gösterir; sort_fields ({sütun: satır alanı}) içindeki sütun başlıklarına
+        tıklanınca satırlar o alana göre sıralanır, ikinci tıklama yönü çevirir.
+
+        Permütasyonlar SortedResults'ta saklanır; sıralama değiştirmek satırları yeniden
+        eklemez, yalnızca row_at eşlemesini değiştirir.
+        """
+        results = SortedResults(rows)
+
+        def show():
+            if self.sort_column is None:
+                self.set_rows(len(rows), lambda i: row_values(rows[i]))
+            else:
+                order = results.order(sort_fields[self.sort_column], self.descending)
+                self.set_rows(len(rows), lambda i: row_values(rows[order[i]]))
+
+        def on_heading(col):
+            self.descending = not self.descending if col == self.sort_column else False
+            self.sort_column = col
+            self._mark_headings()
+            show()
+
+        for col in self.columns:
+            self.tree.heading(col, command=(lambda col=col: on_heading(col)) if col in sort_fields else "")
+        # Yeni sonuç kümesi önceki sıralamayı korur
+        if self.sort_column not in sort_fields:
+            self.sort_column = None
+        self._mark_headings()
+        show()
+
+    def _mark_headings(self):
+        for col in self.columns:
+            arrow = ""
+            if col == self.sort_column:
+                arrow = " ▼" if self.descending else " ▲"
+            self.tree.heading(col, text=col + arrow)
+
+    def _visible_rows(self):
+        height = self.tree.winfo_height()
+        if height <= 1:
+            # Henüz çizilmedi; ilk <Configure> olayında yeniden hesaplanır
+            return 1
+        bbox = self.tree.bbox(self.items[0]) if self.items else None
+        if bbox:
+            header, row_height = bbox[1], bbox[3]
+        else:
+            row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+            header = row_height + 4
+        return max(1, (height - header) // row_height)
+
+    def _render(self):
+        visible = min(self._visible_rows(), self.count)
+        while len(self.items) < visible:
+            self.items.append(self.tree.insert("", tk.END))
+        while len(self.items) > visible:
+            self.tree.delete(self.items.pop())
+
+        self.first = max(0, min(self.first, self.count - visible))
+        selection = ()
+        for offset, item in enumerate(self.items):
+            row = self.first + offset
+            self.tree.item(item, values=self.row_at(row))
+            if row == self.selected_row:
+                selection = (item,)
+        # Seçim öğeye değil satıra aittir; satır pencereden çıkınca seçim görünmez olur
+        if self.tree.selection() != selection:
+            self.tree.selection_set(selection)
+
+        if self.count:
+            self.scrollbar.set(self.first / self.count, (self.first + visible) / self.count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, row):
+        self.first = row
+        self._render()
+        return "break"
+
+    def scroll_rows(self, rows):
+        return self.scroll_to(self.first + rows)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.count))
+        elif unit == "pages":
+            self.scroll_rows(int(amount) * self._visible_rows())
+        else:
+            self.scroll_rows(int(amount))
+
+    def _on_wheel(self, event):
+        return self.scroll_rows(-self.wheel_rows if event.delta > 0 else self.wheel_rows)
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self.items:
+            self.selected_row = self.first + self.items.index(selection[0])
+
+    def _move_selection(self, step):
+        if self.selected_row is None:
+            self.selected_row = self.first
+        else:
+            self.selected_row = max(0, min(self.selected_row + step, self.count - 1))
+        visible = len(self.items)
+        if self.selected_row < self.first:
+            self.first = self.selected_row
+        elif self.selected_row >= self.first + visible:
+            self.first = self.selected_row - visible + 1
+        self._render()
+        return "break"
+
+    def selected(self):
+        """Seçili satırın indeksi veya None."""
+        return self.selected_row
+
+
+# Tuval Listesi
+class CanvasTable(ctk.CTkFrame):
+    """Satırları pencere öğesi oluşturmadan tek bir tuvale metin olarak çizen liste.
+
+    Yalnızca görünen satır kadar tuval öğesi (bir arka plan dikdörtgeni ve sütun başına bir
+    metin) tutulur; kaydırıldığında öğeler yeniden oluşturulmaz, metinleri değiştirilir.
+    Renkler customtkinter temasından alınır, açık/koyu mod değişince yeniden çizilir.
+    """
+
+    def __init__(self, parent, columns, row_height=28, font=("Arial", 10), header_font=("Arial", 12, "bold"),
+                 wheel_rows=3, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.columns = columns
+        self.row_height = row_height
+        self.font = tkfont.Font(self, font=font)
+        self.header_font = tkfont.Font(self, font=header_font)
+        self.wheel_rows = wheel_rows
+        self.count = 0
+        self.row_at = None
+        self.first = 0
+        self.selected_row = None
+        self.row_items = []
+        self.column_width = 0
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, bd=0)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.canvas.bind("<Configure>", lambda event: self._layout())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda event: self.scroll_rows(
+            -self.wheel_rows if event.delta > 0 else self.wheel_rows))
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_rows(-self.wheel_rows))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_rows(self.wheel_rows))
+        self.canvas.bind("<Prior>", lambda event: self.scroll_rows(-len(self.row_items)))
+        self.canvas.bind("<Next>", lambda event: self.scroll_rows(len(self.row_items)))
+        self.canvas.bind("<Home>", lambda event: self.scroll_to(0))
+        self.canvas.bind("<End>", lambda event: self.scroll_to(self.count))
+
+    def set_rows(self, count, row_at):
+        """count satırlık yeni sonucu gösterir; row_at(i) i. satırın değer demetini döndürür."""
+        self.count = count
+        self.row_at = row_at
+        self.first = 0
+        self.selected_row = None
+        self._render()
+
+    def _colors(self):
+        theme = ctk.ThemeManager.theme
+        # Zemin çerçevenin kendi rengidir; şeritler temanın diğer çerçeve tonuyla çizilir
+        background = self._fg_color if self._fg_color != "transparent" else theme["CTkFrame"]["fg_color"]
+        stripe = theme["CTkFrame"]["top_fg_color" if background == theme["CTkFrame"]["fg_color"] else "fg_color"]
+        return {
+            "background": self._apply_appearance_mode(background),
+            "stripe": self._apply_appearance_mode(stripe),
+            "text": self._apply_appearance_mode(theme["CTkLabel"]["text_color"]),
+            "selected": self._apply_appearance_mode(theme["CTkButton"]["fg_color"]),
+        }
+
+    def _layout(self):
+        # Yalnızca boyut değişince öğeler yeniden kurulur
+        self.canvas.delete("all")
+        width = max(self.canvas.winfo_width(), 1)
+        height = self.canvas.winfo_height()
+        self.column_width = width / len(self.columns)
+        colors = self._colors()
+        self.canvas.configure(bg=colors["background"])
+
+        self.canvas.create_rectangle(0, 0, width, self.row_height, width=0, fill=colors["stripe"])
+        for c, col in enumerate(self.columns):
+            self.canvas.create_text(c * self.column_width + 8, self.row_height / 2, anchor="w", fill=colors["text"],
+                                    font=self.header_font, text=self._fit(col, self.header_font))
+
+        self.row_items = []
+        for r in range(max(0, height // self.row_height - 1)):
+            y = (r + 1) * self.row_height
+            rect = self.canvas.create_rectangle(0, y, width, y + self.row_height, width=0)
+            texts = [self.canvas.create_text(c * self.column_width + 8, y + self.row_height / 2, anchor="w",
+                                             font=self.font) for c in range(len(self.columns))]
+            self.row_items.append((rect, texts))
+        self._render()
+
+    def _fit(self, text, font=None):
+        # Sütuna sığmayan metin "…" ile kısaltılır
+        font = font or self.font
+        limit = self.column_width - 16
+        if font.measure(text) <= limit:
+            return text
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if font.measure(text[:middle] + "…") <= limit:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low] + "…"
+
+    def _render(self):
+        visible = len(self.row_items)
+        self.first = max(0, min(self.first, self.count - visible))
+        colors = self._colors()
+        for offset, (rect, texts) in enumerate(self.row_items):
+            row = self.first + offset
+            if row >= self.count:
+                self.canvas.itemconfigure(rect, state="hidden")
+                for text in texts:
+                    self.canvas.itemconfigure(text, state="hidden")
+                continue
+            if row == self.selected_row:
+                fill = colors["selected"]
+            else:
+                # Şeritler satıra bağlıdır, kaydırınca satırla birlikte kayar
+                fill = colors["stripe"] if row % 2 else colors["background"]
+            self.canvas.itemconfigure(rect, state="normal", fill=fill)
+            for text, value in zip(texts, self.row_at(row)):
+                self.canvas.itemconfigure(text, state="normal", fill=colors["text"], text=self._fit(str(value)))
+
+        if self.count:
+            self.scrollbar.set(self.first / self.count, min(1, (self.first + visible) / self.count))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _set_appearance_mode(self, mode_string):
+        super()._set_appearance_mode(mode_string)
+        self._layout()
+
+    def scroll_to(self, row):
+        self.first = row
+        self._render()
+        return "break"
+
+    def scroll_rows(self, rows):
+        return self.scroll_to(self.first + rows)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.count))
+        elif unit == "pages":
+            self.scroll_rows(int(amount) * len(self.row_items))
+        else:
+            self.scroll_rows(int(amount))
+
+    def _on_click(self, event):
+        self.canvas.focus_set()
+        offset = int(event.y // self.row_height) - 1
+        if 0 <= offset < len(self.row_items) and self.first + offset < self.count:
+            self.selected_row = self.first + offset
+            self._render()
+
+    def selected(self):
+        """Seçili satırın indeksi veya None."""
+        return self.selected_row
+
+
+# Parça Parça Tablo Doldurma
+class TreeviewFeeder:
+    """Satırları Treeview'e, her after adımında frame_ms süresini aşmayan gruplar halinde ekler.
+
+    İlk ekran dolusu satır hemen eklenir, kalanlar olay döngüsü çalışmaya devam ederken akar.
+    Grup boyutu ölçülen satır başı ekleme süresine göre uyarlanır. Tablo yok edildiğinde
+    (ör. başka bir ekrana geçildiğinde) kendiliğinden durur.
+    """
+
+    def __init__(self, tree, rows, insert, frame_ms=8, first_rows=50):
+        self.tree = tree
+        self.rows = rows
+        self.insert = insert
+        self.frame_ms = frame_ms
+        self.first_rows = first_rows
+        self.position = 0
+        self.batch = 16
+        self.pending = None
+
+    def start(self):
+        self._feed(self.first_rows)
+        if not self.done:
+            self.tree.bind("<Destroy>", lambda event: self.cancel(), add="+")
+            self.pending = self.tree.after(1, self._tick)
+        return self
+
+    @property
+    def done(self):
+        return self.position >= len(self.rows)
+
+    def cancel(self):
+        if self.pending is not None:
+            try:
+                self.tree.after_cancel(self.pending)
+            except tk.TclError:
+                pass
+            self.pending = None
+        self.position = len(self.rows)
+
+    def _feed(self, count):
+        end = min(self.position + count, len(self.rows))
+        for i in range(self.position, end):
+            self.insert(self.rows[i])
+        self.position = end
+
+    def _tick(self):
+        self.pending = None
+        deadline = time.perf_counter() + self.frame_ms / 1000
+        while not self.done:
+            started = time.perf_counter()
+            self._feed(self.batch)
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            per_row = (now - started) / self.batch
+            # Kalan bütçeye sığacak kadar satır; tek adımda bir anda çok büyümesin
+            self.batch = max(1, min(int((deadline - now) / per_row) if per_row else self.batch * 2, self.batch * 4))
+        if not self.done:
+            self.pending = self.tree.after(1, self._tick)
+
+
+# Arka Plan İşleri
+class BackgroundTask:
+    """work(report) fonksiyonunu ayrı bir iş parçacığında çalıştırır.
+
+    Tk nesnelerine yalnızca ana iş parçacığından dokunulabildiği için iş parçacığı hiçbir
+    pencere öğesi çağırmaz: ilerleme ve sonuç bir kuyruğa yazılır, kuyruk root.after ile
+    ana döngüde boşaltılır. on_progress(oran, metin), on_done(sonuç) ve on_error(hata)
+    ana iş parçacığında çağrılır. owner verilirse, o pencere öğesi yok edildiğinde (ör. ekran
+    yeniden kurulunca) görev iptal edilmiş sayılır ve geri çağrılar yok edilmiş öğelere dokunmaz.
+    """
+
+    def __init__(self, root, work, on_done, on_error=None, on_progress=None, poll_ms=50, owner=None):
+        self.root = root
+        self.owner = owner
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.poll_ms = poll_ms
+        self.messages = queue.Queue()
+        self.cancelled = False
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self.root.after(self.poll_ms, self._drain)
+        return self
+
+    def cancel(self):
+        """Sonucu yok sayar; iş parçacığı işini bitirip sessizce sonlanır."""
+        self.cancelled = True
+
+    def report(self, fraction, text=""):
+        # İş parçacığından çağrılır
+        self.messages.put(("progress", (fraction, text)))
+
+    def _run(self):
+        try:
+            result = self.work(self.report)
+        except Exception as e:
+            self.messages.put(("error", e))
+        else:
+            self.messages.put(("done", result))
+
+    def _alive(self):
+        return not self.cancelled and (self.owner is None or bool(self.owner.winfo_exists()))
+
+    def _drain(self):
+        try:
+            while True:
+                # Bir geri çağrı ekranı yeniden kurmuş olabilir; her mesajdan önce yeniden bakılır
+                if not self._alive():
+                    return
+                kind, value = self.messages.get_nowait()
+                if kind == "progress":
+                    if self.on_progress:
+                        self.on_progress(*value)
+                elif kind == "done":
+                    self.on_done(value)
+                    return
+                else:
+                    if self.on_error:
+                        self.on_error(value)
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(self.poll_ms, self._drain)
+
+
+# Görsel Önbelleği
+class ImageCache:
+    """Görselleri diskten bir kez çözer; ölçeklenmiş kopyaları (yol, boyut) anahtarıyla saklar.
+
+    En son kullanılan max_variants kopya tutulur (LRU). scaled() iş parçacığından çağrılabilir;
+    photo() Tk nesnesi ürettiği için yalnızca ana iş parçacığında çağrılmalıdır.
+    """
+
+    def __init__(self, max_variants=8):
+        self.max_variants = max_variants
+        self.originals = {}
+        self.variants = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _original(self, path):
+        with self.lock:
+            image = self.originals.get(path)
+        if image is None:
+            # Çözme kilit dışında yapılır; ana iş parçacığının get() çağrıları beklemesin
+            image = Image.open(path)
+            image.load()
+            with self.lock:
+                image = self.originals.setdefault(path, image)
+        return image
+
+    def get(self, path, size):
+        """Hazır kopyayı döndürür; yoksa None. Diske ve yeniden örneklemeye dokunmaz."""
+        with self.lock:
+            variant = self.variants.get((path, size))
+            if variant is not None:
+                self.variants.move_to_end((path, size))
+            return variant
+
+    def latest(self, path):
+        """path için en son kullanılan kopya veya None."""
+        with self.lock:
+            for key in reversed(self.variants):
+                if key[0] == path:
+                    return self.variants[key]
+        return None
+
+    def scaled(self, path, size):
+        variant = self.get(path, size)
+        if variant is None:
+            image = self._original(path).resize(size, Image.LANCZOS)
+            with self.lock:
+                variant = self.variants[(path, size)] = {"image": image, "photo": None}
+                while len(self.variants) > self.max_variants:
+                    self.variants.popitem(last=False)
+        return variant
+
+    def photo(self, variant):
+        # PhotoImage kopyayla birlikte saklanır; ekran değişimlerinde yeniden oluşturulmaz
+        if variant["photo"] is None:
+            variant["photo"] = ImageTk.PhotoImage(variant["image"])
+        return variant["photo"]
+
+
+def show_background_image(root, path, cache, on_error=None, debounce_ms=150):
+    """path görselini root'u kaplayan bir etikette gösterir.
+
+    Pencere boyutundaki kopya önbellekte yoksa ayrı iş parçacığında ölçeklenir; bu sırada
+    aynı görselin son kopyası gösterilir. Boyut değişiklikleri debounce_ms boyunca yeni
+    <Configure> gelmezse işlenir. Görsel açılamazsa etiket kaldırılır ve on_error(hata) çağrılır.
+    """
+    label = tk.Label(root)
+    label.place(x=0, y=0, relwidth=1, relheight=1)
+    state = {"size": None, "pending": None}
+
+    def set_photo(size, variant):
+        if label.winfo_exists() and size == state["size"]:
+            # Kopya önbellekten çıkarılsa da etiket görüntüsünü kaybetmesin
+            label.image = cache.photo(variant)
+            label.configure(image=label.image)
+
+    def fail(error):
+        if label.winfo_exists():
+            label.destroy()
+            if on_error:
+                on_error(error)
+
+    def request():
+        state["pending"] = None
+        if not label.winfo_exists():
+            return
+        size = (root.winfo_width(), root.winfo_height())
+        # Pencere henüz çizilmediyse (1×1) ilk <Configure> olayı beklenir
+        if size == state["size"] or min(size) <= 1:
+            return
+        state["size"] = size
+        variant = cache.get(path, size)
+        if variant is not None:
+            set_photo(size, variant)
+        else:
+            BackgroundTask(root, lambda report: cache.scaled(path, size),
+                           lambda variant: set_photo(size, variant), fail).start()
+
+    def on_configure(event):
+        if state["pending"] is not None:
+            label.after_cancel(state["pending"])
+        state["pending"] = label.after(debounce_ms, request)
+
+    latest = cache.latest(path)
+    if latest is not None:
+        label.image = cache.photo(latest)
+        label.configure(image=label.image)
+    request()
+    label.bind("<Configure>", on_configure)
+    return label
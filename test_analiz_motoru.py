@@ -0,0 +1,195 @@
+import json
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import analiz_motoru
+from analiz_motoru import (CODED_FIELDS, URI_INDEX_FIELDS, analyze_behaviour, analyze_by_uri, analyze_sessions,
+                           load_history_table, name_index, open_history, uri_index)
+
+CODED = {name for name, _ in CODED_FIELDS}
+ARTISTS = ["Sezen Aksu", "Şebnem Ferah", "İlhan İrem", "Barış Manço", "Little Mix"]
+
+
+def make_records(seed, count, start):
+    """Aynı saniyede biten dinlemeler, podcast bölümleri ve eksik alanlar içeren dışa aktarım kayıtları."""
+    rng = random.Random(seed)
+    records = []
+    moment = start
+    for _ in range(count):
+        # Her beş dinlemeden biri öncekiyle aynı ts'yi paylaşır
+        if rng.random() > 0.2:
+            moment += timedelta(seconds=rng.randint(30, 4000))
+        artist = rng.choice(ARTISTS)
+        track = f"Şarkı {rng.randint(0, 40)}"
+        record = {
+            "ts": moment.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "platform": rng.choice(["android", "ios", "windows 10"]),
+            "ms_played": rng.randint(0, 400_000),
+            "master_metadata_track_name": track,
+            "master_metadata_album_artist_name": artist,
+            "master_metadata_album_album_name": f"Albüm {rng.randint(0, 4)}",
+            "spotify_track_uri": f"spotify:track:{ARTISTS.index(artist)}-{track}",
+            "reason_start": rng.choice(["trackdone", "fwdbtn", "clickrow"]),
+            "reason_end": rng.choice(["trackdone", "fwdbtn", "endplay"]),
+            "shuffle": rng.random() < 0.5,
+            "skipped": rng.random() < 0.3,
+            "offline": rng.random() < 0.1,
+        }
+        if rng.random() < 0.03:
+            record["master_metadata_track_name"] = None
+            record["spotify_track_uri"] = None
+            record["spotify_episode_uri"] = f"spotify:episode:{rng.randint(0, 3)}"
+        if rng.random() < 0.02:
+            del record["master_metadata_album_artist_name"]
+        records.append(record)
+    return records
+
+
+def write_export(directory, name, records):
+    with open(directory / name, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False)
+
+
+@pytest.fixture
+def history_dir(tmp_path):
+    start = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    first = make_records(1, 400, start)
+    second = make_records(2, 400, start + timedelta(days=200))
+    directory = tmp_path / "veri"
+    directory.mkdir()
+    write_export(directory, "Streaming_History_Audio_0.json", first)
+    # İkinci dışa aktarım ilkinin son yarısını tekrar içerir
+    write_export(directory, "Streaming_History_Audio_1.json", first[200:] + second)
+    write_export(directory, "SearchQueries.json", [{"searchTime": "2021-01-01", "searchQuery": "x"}] * 5)
+    return directory
+
+
+def table_rows(table):
+    """Tablo satırları, kodlar çözülmüş değer demetleri olarak (kodlama sırasından bağımsız)."""
+    columns = list(table.columns)
+    return Counter(
+        tuple(table.decode(name, int(table[name][row])) if name in CODED else int(table[name][row])
+              for name in columns)
+        for row in range(len(table))
+    )
+
+
+def uri_names(table):
+    index = uri_index(table)
+    return {
+        uri: tuple(table.decode(field, int(index["uri_" + field][code])) for field in URI_INDEX_FIELDS)
+        for code, uri in enumerate(table.dictionaries["uri"].values)
+        if int(index["uri_track"][code]) >= 0
+    }
+
+
+def plain(value):
+    """NumPy skalerlerini Python değerlerine çevirir; iki yolun çıktıları doğrudan karşılaştırılabilsin."""
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def unordered(rows):
+    # Eşit değerli satırlar sözlük kodu sırasıyla gelir; kodlar adların ilk görülme sırasına bağlıdır
+    return sorted(plain(rows), key=lambda row: repr(sorted(row.items(), key=repr)))
+
+
+def analyses(table):
+    behaviour = plain(analyze_behaviour(table, min_plays=2))
+    for name in ("tracks", "artists", "reason_end"):
+        behaviour[name] = unordered(behaviour[name])
+    return {
+        "uri": unordered(analyze_by_uri(table)),
+        "sessions": unordered(analyze_sessions(table)),
+        "behaviour": behaviour,
+        "search": sorted((field, table.decode(field, code)) for field, code in name_index(table).search("şeb")),
+    }
+
+
+def test_non_history_files_are_skipped(history_dir):
+    table = load_history_table(str(history_dir), workers=1)
+    assert min(int(ts) for ts in table["ts"]) > 0
+    assert table.duplicates_dropped == 200
+
+
+def test_parallel_load_matches_serial(history_dir):
+    serial = load_history_table(str(history_dir), workers=1)
+    parallel = load_history_table(str(history_dir), workers=2)
+    assert table_rows(parallel) == table_rows(serial)
+    assert [int(ts) for ts in parallel["ts"]] == [int(ts) for ts in serial["ts"]]
+    assert parallel.duplicates_dropped == serial.duplicates_dropped
+    assert analyses(parallel) == analyses(serial)
+
+
+def test_incremental_merge_matches_full_rebuild(history_dir, tmp_path):
+    cache_dir = str(tmp_path / "onbellek")
+    added = history_dir / "Streaming_History_Audio_2.json"
+    open_history(str(history_dir), cache_dir, workers=1)
+
+    # Yeni dışa aktarım: arşivdeki dinlemelerin tekrarı, aynı ts'de farklı süre ve yeni adlar
+    old = json.loads((history_dir / "Streaming_History_Audio_1.json").read_text(encoding="utf-8"))
+    new = old[:50] + [dict(record, ms_played=record["ms_played"] + 1, master_metadata_album_album_name="Eş Zaman")
+                      for record in old[50:60]]
+    new += make_records(3, 100, datetime(2022, 6, 1, tzinfo=timezone.utc))
+    new += [dict(record, master_metadata_album_artist_name="Yeni Sanatçı") for record in new[-5:]]
+    write_export(history_dir, added.name, new)
+
+    merged = open_history(str(history_dir), cache_dir, workers=1)
+    rebuilt = load_history_table(str(history_dir), workers=1)
+    assert table_rows(merged) == table_rows(rebuilt)
+    assert [(int(ts), int(ms)) for ts, ms in zip(merged["ts"], merged["ms_played"])] == \
+        [(int(ts), int(ms)) for ts, ms in zip(rebuilt["ts"], rebuilt["ms_played"])]
+    assert merged.duplicates_dropped == rebuilt.duplicates_dropped
+    assert uri_names(merged) == uri_names(rebuilt)
+    assert analyses(merged) == analyses(rebuilt)
+
+
+def reference_duplicates(ts, uri, ms_played):
+    seen = set()
+    duplicate = []
+    for key in zip(ts, uri, ms_played):
+        duplicate.append(key in seen)
+        seen.add(key)
+    return duplicate
+
+
+def collision_columns():
+    rng = random.Random(4)
+    ts = [rng.randint(0, 50) for _ in range(3000)]
+    uri = [rng.randint(0, 20) for _ in range(3000)]
+    ms_played = [rng.randint(0, 3) for _ in range(3000)]
+    return ts, uri, ms_played
+
+
+def test_dedup_bloom_is_exact_under_hash_collisions(monkeypatch):
+    ts, uri, ms_played = collision_columns()
+    # Tüm üçlüler birkaç özete düşer; sonuç yine yalnızca asıl üçlüye bağlı olmalı
+    monkeypatch.setattr(analiz_motoru, "_play_hash", lambda ts, uri, ms_played: (ts + uri) % 4)
+    assert list(analiz_motoru._duplicate_mask_bloom(ts, uri, ms_played)) == reference_duplicates(ts, uri, ms_played)
+
+
+@pytest.mark.skipif(analiz_motoru.np is None, reason="NumPy yüklü değil")
+def test_dedup_sorted_is_exact_under_hash_collisions(monkeypatch):
+    np = analiz_motoru.np
+    ts, uri, ms_played = collision_columns()
+    monkeypatch.setattr(analiz_motoru, "_play_hashes", lambda ts, uri, ms_played: ((ts + uri) % 4).astype(np.uint64))
+    mask = analiz_motoru._duplicate_mask_sorted(np.array(ts), np.array(uri), np.array(ms_played))
+    assert mask.tolist() == reference_duplicates(ts, uri, ms_played)
+
+
+@pytest.mark.skipif(analiz_motoru.np is None, reason="NumPy yüklü değil")
+def test_numpy_and_python_paths_agree(history_dir, monkeypatch):
+    with_numpy = load_history_table(str(history_dir), workers=1)
+    expected = (table_rows(with_numpy), with_numpy.duplicates_dropped, analyses(with_numpy))
+
+    monkeypatch.setattr(analiz_motoru, "np", None)
+    without_numpy = load_history_table(str(history_dir), workers=1)
+    assert (table_rows(without_numpy), without_numpy.duplicates_dropped, analyses(without_numpy)) == expected